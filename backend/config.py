@@ -4,61 +4,77 @@ Loads environment variables and provides centralized config access
 """
 
 import os
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (production gets env from the orchestrator)
+if os.getenv('FLASK_ENV') != 'production':
+    load_dotenv()
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Base configuration"""
+    """Base configuration (read once at import; immutable afterwards)"""
     
     # Flask
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-    FLASK_ENV = os.getenv('FLASK_ENV', 'development')
-    DEBUG = FLASK_ENV == 'development'
+    SECRET_KEY: str = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    FLASK_ENV: str = os.getenv('FLASK_ENV', 'development')
+    DEBUG: bool = FLASK_ENV == 'development'
     
     # API Keys
-    X_API_BEARER_TOKEN = os.getenv('X_API_BEARER_TOKEN', '')
-    ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', '')
-    TRUTH_SOCIAL_API_KEY = os.getenv('TRUTH_SOCIAL_API_KEY', '')
+    X_API_BEARER_TOKEN: str = os.getenv('X_API_BEARER_TOKEN', '')
+    ALPHA_VANTAGE_API_KEY: str = os.getenv('ALPHA_VANTAGE_API_KEY', '')
+    TRUTH_SOCIAL_API_KEY: str = os.getenv('TRUTH_SOCIAL_API_KEY', '')
     
     # AWS
-    AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID', '')
-    AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY', '')
-    AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
-    S3_BUCKET_NAME = os.getenv('S3_BUCKET_NAME', 'political-alpha-data')
+    AWS_ACCESS_KEY_ID: str = os.getenv('AWS_ACCESS_KEY_ID', '')
+    AWS_SECRET_ACCESS_KEY: str = os.getenv('AWS_SECRET_ACCESS_KEY', '')
+    AWS_REGION: str = os.getenv('AWS_REGION', 'us-east-1')
+    S3_BUCKET_NAME: str = os.getenv('S3_BUCKET_NAME', 'political-alpha-data')
     
     # Database
-    DATABASE_URL = os.getenv('DATABASE_URL', 'postgresql://localhost:5432/political_alpha')
+    DATABASE_URL: str = os.getenv('DATABASE_URL', 'postgresql://localhost:5432/political_alpha')
     
     # Redis
-    REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    REDIS_URL: str = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     
     # Celery
-    CELERY_BROKER_URL = REDIS_URL
-    CELERY_RESULT_BACKEND = REDIS_URL
+    CELERY_BROKER_URL: str = REDIS_URL
+    CELERY_RESULT_BACKEND: str = REDIS_URL
+    CELERY_PREFETCH_MULTIPLIER: int = int(os.getenv('CELERY_PREFETCH_MULTIPLIER', '1'))  # 1 = fair dispatch for long tasks
     
     # Performance Targets
-    MAX_LATENCY_SECONDS = 300  # 5 minutes end-to-end
-    INGESTION_TIMEOUT_SECONDS = 30
-    NLP_TIMEOUT_SECONDS = 2
-    EVENT_STUDY_TIMEOUT_SECONDS = 1
-    API_TIMEOUT_MS = 500
+    MAX_LATENCY_SECONDS: int = 300  # 5 minutes end-to-end
+    INGESTION_TIMEOUT_SECONDS: int = 30
+    NLP_TIMEOUT_SECONDS: int = 2
+    EVENT_STUDY_TIMEOUT_SECONDS: int = 1
+    API_TIMEOUT_MS: int = 500
+    
+    # NLP
+    SENTIMENT_BACKEND: str = os.getenv('SENTIMENT_BACKEND', 'torch')  # 'torch', 'onnx' (int8, CPU) or 'vader' (lexicon only)
+    ONNX_MODEL_DIR: str = os.getenv('ONNX_MODEL_DIR', 'onnx_models')
+    # 'false' lets texts with a strong tone-keyword margin skip the transformer
+    SENTIMENT_STRICT: bool = os.getenv('SENTIMENT_STRICT', 'true').lower() == 'true'
+    # torch.compile the sentiment model at startup (slower start, faster steady-state forward)
+    SENTIMENT_COMPILE: bool = os.getenv('SENTIMENT_COMPILE', 'false').lower() == 'true'
+    # Fitted LDA artifact from TopicModeler.save(); keyword-only topics if missing
+    TOPIC_MODEL_PATH: str = os.getenv('TOPIC_MODEL_PATH', 'nlp_models/topic_model.joblib')
     
     # Event Study Parameters
-    ESTIMATION_WINDOW_DAYS = 252  # 1 year for CAPM
-    RISK_FREE_RATE = 0.04  # 4% annual
-    MARKET_INDEX = 'SPY'  # S&P 500 ETF as market proxy
-    SIGNIFICANCE_LEVEL = 0.05  # p < 0.05
+    ESTIMATION_WINDOW_DAYS: int = 252  # 1 year for CAPM
+    RISK_FREE_RATE: float = 0.04  # 4% annual
+    MARKET_INDEX: str = 'SPY'  # S&P 500 ETF as market proxy
+    # Directory for on-disk Parquet price history (e.g. ~/.cache/trumpplan/yf); empty disables
+    PRICE_CACHE_DIR: str = os.getenv('PRICE_CACHE_DIR', '')
+    SIGNIFICANCE_LEVEL: float = 0.05  # p < 0.05
     
     # Data Sources
-    TRUMP_TWITTER_ARCHIVE_URL = 'https://www.thetrumparchive.com/faq'
-    KAGGLE_DATASET = 'austinreese/trump-tweets'
+    TRUMP_TWITTER_ARCHIVE_URL: str = 'https://www.thetrumparchive.com/faq'
+    KAGGLE_DATASET: str = 'austinreese/trump-tweets'
     
     # Compliance
-    PLATFORM_NAME = 'Political Sentiment Alpha Platform'
-    DISCLAIMER_TEXT = '''
+    PLATFORM_NAME: str = 'Political Sentiment Alpha Platform'
+    DISCLAIMER_TEXT: str = '''
     IMPORTANT DISCLAIMER: This platform provides general research and informational 
     content only. It does NOT constitute investment advice, personalized recommendations, 
     or an offer to buy/sell securities. We are NOT a registered investment advisor (RIA). 
@@ -66,18 +82,17 @@ class Config:
     Consult with a licensed financial advisor before making investment decisions.
     '''
     
-    @classmethod
-    def validate(cls):
+    def validate(self):
         """Validate that critical config values are set"""
         warnings = []
         
-        if not cls.ALPHA_VANTAGE_API_KEY:
+        if not self.ALPHA_VANTAGE_API_KEY:
             warnings.append('ALPHA_VANTAGE_API_KEY not set - market data will be limited')
         
-        if not cls.X_API_BEARER_TOKEN:
+        if not self.X_API_BEARER_TOKEN:
             warnings.append('X_API_BEARER_TOKEN not set - real-time Twitter data unavailable')
         
-        if not cls.AWS_ACCESS_KEY_ID:
+        if not self.AWS_ACCESS_KEY_ID:
             warnings.append('AWS credentials not set - S3 storage unavailable')
         
         return warnings
@@ -86,9 +101,9 @@ class Config:
 # Create config instance
 config = Config()
 
-# Validate on import
+# Validate once on import; only print when asked (avoids repeating in every worker)
 warnings = config.validate()
-if warnings:
+if warnings and (__name__ == '__main__' or os.getenv('CONFIG_VERBOSE')):
     print("⚠️  Configuration Warnings:")
     for warning in warnings:
         print(f"  - {warning}")
@@ -9,20 +9,252 @@ ETL pipeline for:
 4. Timestamp standardization (UTC)
 """
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
+import io
 import json
+import time
 import warnings
 
 import pandas as pd
 import numpy as np
+from pandas.api.types import union_categoricals
 import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
 
 from config import config
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 warnings.filterwarnings('ignore')
 
+# Objects at or above the threshold go up as concurrent multipart uploads;
+# smaller ones as a single PUT (no thread pool round-trip)
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=S3_MULTIPART_THRESHOLD,
+    max_concurrency=10,
+    use_threads=True
+)
+
+# datetime64 columns as int64 epoch nanoseconds: NaT is the minimum int64
+_NAT_NS = np.iinfo(np.int64).min
+_MAX_NS = np.iinfo(np.int64).max
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _range_mask(ts_ns, lo, hi):
+        """Rows with lo <= ts <= hi (NaT never matches: lo is always above it)"""
+        mask = np.empty(ts_ns.shape[0], dtype=np.bool_)
+        for i in prange(ts_ns.shape[0]):
+            mask[i] = ts_ns[i] >= lo and ts_ns[i] <= hi
+        return mask
+
+    @njit(cache=True)
+    def _sort_direction(ts_ns):
+        """1 if non-decreasing, -1 if non-increasing, 0 if neither (stops once both fail)"""
+        ascending = True
+        descending = True
+        for i in range(1, ts_ns.shape[0]):
+            if ts_ns[i] < ts_ns[i - 1]:
+                ascending = False
+            elif ts_ns[i] > ts_ns[i - 1]:
+                descending = False
+            if not ascending and not descending:
+                return 0
+        return 1 if ascending else -1
+
+    @njit(cache=True)
+    def _count_after(ts_ns, threshold):
+        """Number of timestamps strictly after threshold"""
+        count = 0
+        for i in range(ts_ns.shape[0]):
+            if ts_ns[i] > threshold:
+                count += 1
+        return count
+
+    @njit(cache=True)
+    def _text_quality(lengths, min_len):
+        """(missing, short) counts from text lengths in one pass (NaN = missing)"""
+        missing = 0
+        short = 0
+        for i in range(lengths.shape[0]):
+            if np.isnan(lengths[i]):
+                missing += 1
+            elif lengths[i] < min_len:
+                short += 1
+        return missing, short
+else:
+    def _range_mask(ts_ns, lo, hi):
+        """NumPy fallback for the date-range kernel when numba is unavailable"""
+        return (ts_ns >= lo) & (ts_ns <= hi)
+
+    def _sort_direction(ts_ns):
+        """NumPy fallback for the sort-direction check when numba is unavailable"""
+        if (ts_ns[1:] >= ts_ns[:-1]).all():
+            return 1
+        if (ts_ns[1:] <= ts_ns[:-1]).all():
+            return -1
+        return 0
+
+    def _count_after(ts_ns, threshold):
+        """NumPy fallback for the future-timestamp kernel when numba is unavailable"""
+        return int((ts_ns > threshold).sum())
+
+    def _text_quality(lengths, min_len):
+        """NumPy fallback for the text-quality kernel when numba is unavailable"""
+        return int(np.isnan(lengths).sum()), int((lengths < min_len).sum())
+
+
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _iso_to_epoch_us(value: str) -> int:
+    """Exact epoch microseconds for an ISO 8601 string (naive values taken as UTC)"""
+    parsed = ciso8601.parse_datetime(value)
+    return (parsed - (_EPOCH_NAIVE if parsed.tzinfo is None else _EPOCH_UTC)) // _ONE_MICROSECOND
+
+
+def _has_utc_offset(value) -> bool:
+    """Whether an ISO 8601 string ends in 'Z' or a ±HH:MM offset"""
+    return isinstance(value, str) and (value.endswith('Z') or (len(value) > 6 and value[-6] in '+-'))
+
+
+def _to_utc(timestamps: pd.Series) -> pd.Series:
+    """
+    Convert a timestamp column to tz-aware UTC, skipping work where possible
+    
+    Already-parsed columns (the usual case: sources parse on ingest) are
+    only localized/converted; strings try the fast ISO 8601 parser before
+    falling back to per-element format inference. Strings carrying UTC
+    offsets (API payloads) go through ciso8601 when installed, which is ~4x
+    faster than pandas' offset handling (sub-microsecond digits dropped).
+    
+    Args:
+        timestamps: Column of datetimes, strings, or epoch values
+    
+    Returns:
+        datetime64[ns, UTC] Series
+    """
+    if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+        if str(timestamps.dt.tz) == 'UTC':
+            return timestamps
+        return timestamps.dt.tz_convert('UTC')
+    
+    if pd.api.types.is_datetime64_dtype(timestamps):
+        return timestamps.dt.tz_localize('UTC')
+    
+    if pd.api.types.is_object_dtype(timestamps) or pd.api.types.is_string_dtype(timestamps):
+        if CISO8601_AVAILABLE and len(timestamps) and _has_utc_offset(timestamps.iat[0]):
+            try:
+                epoch_us = np.fromiter(
+                    map(_iso_to_epoch_us, timestamps.to_numpy()),
+                    dtype=np.int64,
+                    count=len(timestamps)
+                )
+                return pd.Series(
+                    pd.to_datetime(epoch_us * 1000, unit='ns', utc=True),
+                    index=timestamps.index,
+                    name=timestamps.name
+                )
+            except (ValueError, TypeError):
+                # Nulls or non-ISO values: let pandas handle (or reject) them
+                pass
+        try:
+            return pd.to_datetime(timestamps, utc=True, format='ISO8601')
+        except (ValueError, TypeError):
+            pass
+    
+    return pd.to_datetime(timestamps, utc=True)
+
+
+def _epoch_ns(timestamps: pd.Series) -> np.ndarray:
+    """
+    Timestamp column as int64 epoch nanoseconds (UTC for tz-aware columns)
+    
+    Datetime columns are viewed without copying; anything else is parsed first.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = _to_utc(timestamps)
+    return timestamps.array.asi8
+
+
+def _bound_ns(value) -> int:
+    """Date bound as epoch nanoseconds; naive bounds are taken as UTC"""
+    value = pd.Timestamp(value)
+    if value.tzinfo is not None:
+        value = value.tz_convert('UTC')
+    return value.value
+
+
+# Label columns stored as pandas categoricals after normalization
+_CATEGORICAL_COLUMNS = ('source', 'author')
+
+# Free-text/identifier columns stored as Arrow-backed strings (pyarrow only)
+_ARROW_STRING_COLUMNS = ('id', 'text')
+_ARROW_STRING = 'string[pyarrow]'
+
+
+def _unify_categoricals(dataframes: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Give each categorical label column one shared category set across frames
+    
+    pd.concat only keeps a categorical dtype when every input has identical
+    categories; otherwise it falls back to object. Frames without the column
+    are fine (filled with NaN); a column that is plain object in any frame
+    is left alone.
+    
+    Args:
+        dataframes: Non-empty DataFrames about to be concatenated
+    
+    Returns:
+        List of DataFrames (shallow copies where a column was recoded)
+    """
+    for col in _CATEGORICAL_COLUMNS:
+        columns = [df[col] for df in dataframes if col in df.columns]
+        if len(columns) < 2:
+            continue
+        if not all(isinstance(c.dtype, pd.CategoricalDtype) for c in columns):
+            continue
+        
+        categories = union_categoricals(columns, ignore_order=True).categories
+        unified = []
+        for df in dataframes:
+            if col in df.columns and not df[col].cat.categories.equals(categories):
+                df = df.copy(deep=False)
+                df[col] = df[col].cat.set_categories(categories)
+            unified.append(df)
+        dataframes = unified
+    
+    return dataframes
+
 
 class DataAggregator:
     """Aggregate and normalize data from multiple sources"""
@@ -53,7 +285,9 @@ class DataAggregator:
         if df.empty:
             return pd.DataFrame(columns=self.required_columns)
         
-        normalized = df.copy()
+        # Shallow copy: columns are replaced below, never written in place,
+        # so the caller's frame is untouched without copying row data
+        normalized = df.copy(deep=False)
         
         # Ensure required columns exist
         if 'source' not in normalized.columns:
@@ -64,11 +298,11 @@ class DataAggregator:
             normalized['id'] = [f"{source_name}_{i}" for i in range(len(normalized))]
         
         if 'timestamp' not in normalized.columns:
-            # Use current time if missing
-            normalized['timestamp'] = datetime.utcnow()
+            # Use current time if missing (already UTC, so parsing below is skipped)
+            normalized['timestamp'] = pd.Timestamp(time.time_ns(), tz='UTC')
         
         # Standardize timestamp to UTC
-        normalized['timestamp'] = pd.to_datetime(normalized['timestamp'], utc=True)
+        normalized['timestamp'] = _to_utc(normalized['timestamp'])
         
         # Extract text content (may be in different columns)
         if 'text' not in normalized.columns:
@@ -81,16 +315,31 @@ class DataAggregator:
             else:
                 normalized['text'] = ''
         
-        # Consolidate metrics into JSON
+        # Consolidate metrics into JSON (column-wise: one null mask per metric
+        # column instead of a Series per row)
         metric_columns = ['likes', 'retweets', 'shares', 'comments', 'reposts']
-        if any(col in normalized.columns for col in metric_columns):
-            normalized['metrics'] = normalized.apply(
-                lambda row: {
-                    col: row[col] for col in metric_columns 
-                    if col in row and pd.notna(row[col])
-                },
-                axis=1
-            )
+        present = [col for col in metric_columns if col in normalized.columns]
+        if present:
+            values = {col: normalized[col].tolist() for col in present}
+            masks = {col: normalized[col].notna().tolist() for col in present}
+            normalized['metrics'] = [
+                {col: values[col][i] for col in present if masks[col][i]}
+                for i in range(len(normalized))
+            ]
+        
+        # Low-cardinality label columns as categoricals: integer codes instead
+        # of one Python string per row for concat/dedup/groupby to move
+        for col in _CATEGORICAL_COLUMNS:
+            if col in normalized.columns:
+                normalized[col] = normalized[col].astype('category')
+        
+        # High-cardinality strings packed into Arrow buffers: smaller than
+        # object arrays, hashed without touching PyObjects on dedup, and
+        # handed to Parquet writers without conversion
+        if PYARROW_AVAILABLE:
+            for col in _ARROW_STRING_COLUMNS:
+                if col in normalized.columns and normalized[col].dtype == object:
+                    normalized[col] = normalized[col].astype(_ARROW_STRING)
         
         # Remove duplicates based on ID
         normalized = normalized.drop_duplicates(subset=['id'], keep='first')
@@ -118,18 +367,30 @@ class DataAggregator:
         if not dataframes:
             return pd.DataFrame()
         
-        # Concatenate
-        merged = pd.concat(dataframes, ignore_index=True, sort=False)
+        # Concatenate (categoricals share one category set, so they stay
+        # categorical instead of being recast to object)
+        dataframes = _unify_categoricals(dataframes)
+        merged = pd.concat(dataframes, ignore_index=True, sort=False, copy=False)
         
-        # Remove duplicates (by ID or text+timestamp)
+        # Remove duplicates (by ID or text+timestamp) and sort by timestamp
+        # (most recent first) on row positions only, then gather the rows in a
+        # single take instead of copying the whole frame once per step
         if 'id' in merged.columns:
-            merged = merged.drop_duplicates(subset=['id'], keep='first')
+            duplicated = merged['id'].duplicated(keep='first')
         elif 'text' in merged.columns and 'timestamp' in merged.columns:
-            merged = merged.drop_duplicates(subset=['text', 'timestamp'], keep='first')
+            duplicated = merged.duplicated(subset=['text', 'timestamp'], keep='first')
+        else:
+            duplicated = None
+        
+        rows = np.flatnonzero(~duplicated.to_numpy()) if duplicated is not None else None
         
-        # Sort by timestamp (most recent first)
         if 'timestamp' in merged.columns:
-            merged = merged.sort_values('timestamp', ascending=False)
+            timestamps = merged['timestamp'] if rows is None else merged['timestamp'].take(rows)
+            # ignore_index above makes index labels equal to row positions
+            rows = timestamps.sort_values(ascending=False).index.to_numpy()
+        
+        if rows is not None:
+            merged = merged.take(rows)
         
         print(f"✓ Merged {len(merged)} unique records from {len(dataframes)} sources")
         
@@ -156,13 +417,27 @@ class DataAggregator:
             print("⚠️  No timestamp column for date filtering")
             return df
         
-        filtered = df.copy()
-        
-        if start_date:
-            filtered = filtered[filtered['timestamp'] >= start_date]
-        
-        if end_date:
-            filtered = filtered[filtered['timestamp'] <= end_date]
+        # One compiled pass over epoch nanoseconds, one indexing pass
+        # (boolean indexing already copies)
+        if start_date or end_date:
+            lo = _bound_ns(start_date) if start_date else _NAT_NS + 1
+            hi = _bound_ns(end_date) if end_date else _MAX_NS
+            ts_ns = _epoch_ns(df['timestamp'])
+            direction = _sort_direction(ts_ns)
+            if direction:
+                # Time-ordered input (e.g. newest-first from merge_dataframes):
+                # binary-search the bounds on an ascending view and copy one
+                # contiguous block instead of masking
+                ascending = ts_ns if direction > 0 else ts_ns[::-1]
+                start = int(np.searchsorted(ascending, lo, side='left'))
+                stop = int(np.searchsorted(ascending, hi, side='right'))
+                if direction < 0:
+                    start, stop = len(ts_ns) - stop, len(ts_ns) - start
+                filtered = df.iloc[start:stop].copy()
+            else:
+                filtered = df[_range_mask(ts_ns, lo, hi)]
+        else:
+            filtered = df
         
         print(f"✓ Filtered to {len(filtered)} records in date range")
         
@@ -194,27 +469,29 @@ class DataAggregator:
         if missing_cols:
             issues.append(f"Missing required columns: {missing_cols}")
         
-        # Check for null text
+        # Check for null and very short text: one string-length pass, then one
+        # compiled pass counting both (null count reused for valid_records below)
+        null_text = 0
         if 'text' in df.columns:
-            null_text = df['text'].isna().sum()
+            lengths = df['text'].str.len().to_numpy(dtype=np.float64, na_value=np.nan)
+            null_text, empty_text = _text_quality(lengths, 5)
+            null_text = int(null_text)
             if null_text > 0:
                 issues.append(f"{null_text} records with null text")
-        
-        # Check text length
-        if 'text' in df.columns:
-            empty_text = (df['text'].str.len() < 5).sum()
+            
             if empty_text > total * 0.1:  # More than 10% very short
                 issues.append(f"{empty_text} records with very short text (<5 chars)")
         
-        # Check timestamp validity
+        # Check timestamp validity: compare epoch nanoseconds (UTC for tz-aware
+        # columns), so naive and normalized tz-aware data both work
         if 'timestamp' in df.columns:
-            future_dates = (df['timestamp'] > datetime.utcnow()).sum()
+            future_dates = int(_count_after(_epoch_ns(df['timestamp']), time.time_ns()))
             if future_dates > 0:
                 issues.append(f"{future_dates} records with future timestamps")
         
         # Check for duplicates
         if 'id' in df.columns:
-            duplicates = df['id'].duplicated().sum()
+            duplicates = int(df['id'].duplicated().to_numpy().sum())
             if duplicates > 0:
                 issues.append(f"{duplicates} duplicate IDs found")
         
@@ -222,9 +499,7 @@ class DataAggregator:
         penalty = len(issues) * 0.1
         quality_score = max(0.0, 1.0 - penalty)
         
-        valid_records = total
-        if 'text' in df.columns:
-            valid_records = (~df['text'].isna()).sum()
+        valid_records = total - null_text
         
         return {
             'total_records': total,
@@ -235,23 +510,52 @@ class DataAggregator:
         }
 
 
+# Shared S3 client: built once per process (warm Lambda invocations and
+# repeated S3Storage instances reuse its credentials and HTTPS pool)
+_s3_client = None
+
+
+def _get_s3_client():
+    """Lazily create the shared S3 client (None if AWS is not configured)"""
+    global _s3_client
+    if _s3_client is None and config.AWS_ACCESS_KEY_ID and config.AWS_ACCESS_KEY_ID != 'your_aws_access_key':
+        try:
+            _s3_client = boto3.client(
+                's3',
+                aws_access_key_id=config.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
+                region_name=config.AWS_REGION,
+                # Enough pooled connections for concurrent multipart parts
+                config=BotoConfig(
+                    max_pool_connections=50,
+                    retries={'mode': 'adaptive', 'max_attempts': 5}
+                )
+            )
+        except Exception as e:
+            print(f"⚠️  S3 client initialization failed: {str(e)}")
+    return _s3_client
+
+
+# Shared multipart transfer manager: its thread pool lives for the process
+# instead of one pool per S3Storage instance that is never shut down
+_transfer_manager = None
+
+
+def _get_transfer_manager():
+    """Lazily create the shared multipart transfer manager on the shared S3 client"""
+    global _transfer_manager
+    if _transfer_manager is None:
+        _transfer_manager = create_transfer_manager(_get_s3_client(), S3_TRANSFER_CONFIG)
+    return _transfer_manager
+
+
 class S3Storage:
     """Store data to Amazon S3"""
     
     def __init__(self):
         self.bucket_name = config.S3_BUCKET_NAME
-        self.s3_client = None
-        
-        if config.AWS_ACCESS_KEY_ID and config.AWS_ACCESS_KEY_ID != 'your_aws_access_key':
-            try:
-                self.s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-                    region_name=config.AWS_REGION
-                )
-            except Exception as e:
-                print(f"⚠️  S3 client initialization failed: {str(e)}")
+        self.s3_client = _get_s3_client()
+        self._arrow_fs = None
     
     def upload_dataframe(
         self,
@@ -280,7 +584,18 @@ class S3Storage:
         
         try:
             # Convert DataFrame to bytes
-            if format == 'parquet':
+            if format == 'parquet' and PYARROW_AVAILABLE:
+                # Write straight into an Arrow buffer and stream it to boto3
+                # through a zero-copy reader (no intermediate bytes object);
+                # zstd is markedly smaller than snappy on text columns
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                sink = pa.BufferOutputStream()
+                pq.write_table(table, sink, compression='zstd', use_dictionary=True)
+                arrow_buffer = sink.getvalue()
+                size = arrow_buffer.size
+                buffer = pa.BufferReader(arrow_buffer)
+                content_type = 'application/octet-stream'
+            elif format == 'parquet':
                 buffer = df.to_parquet(index=False)
                 content_type = 'application/octet-stream'
             elif format == 'csv':
@@ -292,13 +607,25 @@ class S3Storage:
             else:
                 raise ValueError(f"Unsupported format: {format}")
             
+            if isinstance(buffer, bytes):
+                size = len(buffer)
+                buffer = io.BytesIO(buffer)
+            
             # Upload to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=buffer,
-                ContentType=content_type
-            )
+            if size < S3_MULTIPART_THRESHOLD:
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=buffer,
+                    ContentType=content_type
+                )
+            else:
+                _get_transfer_manager().upload(
+                    buffer,
+                    self.bucket_name,
+                    key,
+                    extra_args={'ContentType': content_type}
+                ).result()
             
             print(f"✓ Uploaded {len(df)} records to s3://{self.bucket_name}/{key}")
             return True
@@ -310,6 +637,75 @@ class S3Storage:
             print(f"❌ Error uploading to S3: {str(e)}")
             return False
     
+    def write_partitioned(
+        self,
+        df: pd.DataFrame,
+        prefix: str,
+        partition_cols: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Write DataFrame to S3 as a hive-partitioned parquet dataset
+        
+        Arrow streams one file per partition straight to S3, so readers
+        filtering on a partition column (e.g. source) only fetch its files.
+        Rewriting the same prefix replaces the previous run's dataset: the
+        prefix is cleared first, so partitions or part files the new run no
+        longer produces don't linger and get double-read.
+        
+        Args:
+            df: DataFrame to write
+            prefix: S3 key prefix for the dataset root
+            partition_cols: Columns to partition by (default: source)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.s3_client is None:
+            print("⚠️  S3 client not initialized")
+            return False
+        
+        if df.empty:
+            print("⚠️  Cannot upload empty DataFrame")
+            return False
+        
+        if not PYARROW_AVAILABLE:
+            print("⚠️  pyarrow not installed, writing a single object instead")
+            return self.upload_dataframe(df, f"{prefix}/data.parquet")
+        
+        partition_cols = partition_cols or ['source']
+        
+        try:
+            if self._arrow_fs is None:
+                self._arrow_fs = pafs.S3FileSystem(
+                    access_key=config.AWS_ACCESS_KEY_ID,
+                    secret_key=config.AWS_SECRET_ACCESS_KEY,
+                    region=config.AWS_REGION
+                )
+            
+            root = f"{self.bucket_name}/{prefix}"
+            self._arrow_fs.delete_dir_contents(root, missing_dir_ok=True)
+            
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            ds.write_dataset(
+                table,
+                root,
+                format='parquet',
+                partitioning=ds.partitioning(
+                    pa.schema([table.schema.field(col) for col in partition_cols]),
+                    flavor='hive'
+                ),
+                filesystem=self._arrow_fs,
+                basename_template='part-{i}.parquet',
+                existing_data_behavior='overwrite_or_ignore'
+            )
+            
+            print(f"✓ Wrote {len(df)} records to s3://{self.bucket_name}/{prefix}/ (partitioned by {', '.join(partition_cols)})")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error writing dataset to S3: {str(e)}")
+            return False
+    
     def download_dataframe(
         self,
         key: str,
@@ -336,15 +732,21 @@ class S3Storage:
                 Key=key
             )
             
-            body = response['Body'].read()
+            stream = response['Body']
             
             # Parse based on format
-            if format == 'parquet':
-                df = pd.read_parquet(body)
-            elif format == 'csv':
-                df = pd.read_csv(body)
+            if format == 'parquet' and PYARROW_AVAILABLE:
+                # Parquet needs random access (footer first): read once and
+                # parse through a zero-copy Arrow reader over those bytes
+                df = pq.read_table(pa.BufferReader(stream.read())).to_pandas()
+            elif format == 'csv' and PYARROW_AVAILABLE:
+                # Multithreaded C++ parser, consuming the HTTP stream directly
+                df = pacsv.read_csv(stream).to_pandas()
+            elif format in ('parquet', 'csv'):
+                body = io.BytesIO(stream.read())
+                df = pd.read_parquet(body) if format == 'parquet' else pd.read_csv(body)
             elif format == 'json':
-                df = pd.read_json(body, orient='records')
+                df = pd.read_json(stream, orient='records')
             else:
                 raise ValueError(f"Unsupported format: {format}")
             
@@ -431,20 +833,24 @@ def create_daily_batch(
         end_date=date + pd.Timedelta(days=1)
     )
     
-    # Validate
-    quality = aggregator.validate_data_quality(date_filtered)
-    
-    # Store to S3 (if configured)
+    # Store to S3 (if configured), partitioned by source; the upload is
+    # network-bound (releases the GIL), so validate on this thread meanwhile
     s3 = S3Storage()
-    s3_key = f"daily_batches/{date.date().isoformat()}/data.parquet"
-    upload_success = s3.upload_dataframe(date_filtered, s3_key)
+    s3_prefix = f"daily_batches/{date.date().isoformat()}"
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        upload = executor.submit(s3.write_partitioned, date_filtered, s3_prefix)
+        
+        # Validate
+        quality = aggregator.validate_data_quality(date_filtered)
+        
+        upload_success = upload.result()
     
     return {
         'date': date.date().isoformat(),
         'status': 'success' if upload_success else 'local_only',
         'record_count': len(date_filtered),
         'quality_score': quality['quality_score'],
-        's3_path': f"s3://{config.S3_BUCKET_NAME}/{s3_key}" if upload_success else None,
+        's3_path': f"s3://{config.S3_BUCKET_NAME}/{s3_prefix}/" if upload_success else None,
         'validation': quality
     }
 
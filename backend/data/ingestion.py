@@ -16,6 +16,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import warnings
 
+import numpy as np
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
@@ -25,6 +26,63 @@ from config import config
 warnings.filterwarnings('ignore')
 
 
+# Simulated archive data for the prototype (see historical_trump_tweets)
+_SAMPLE_TWEETS = [
+    {
+        'id': '806134244384899072',
+        'text': 'Boeing is building a brand new 747 Air Force One for future presidents, but costs are out of control, more than $4 billion. Cancel order!',
+        'timestamp': '2016-12-06 13:52:00',
+        'retweets': 35000,
+        'likes': 98000,
+        'source': 'Trump Twitter Archive'
+    },
+    {
+        'id': '1163861532819763200',
+        'text': 'Just had a very good call with Apple CEO Tim Cook. Discussed many things including how the U.S. has been treated unfairly on trade with China.',
+        'timestamp': '2019-08-20 14:30:00',
+        'retweets': 28000,
+        'likes': 125000,
+        'source': 'Trump Twitter Archive'
+    },
+    {
+        'id': '1067431826154508289',
+        'text': 'General Motors is very counter to what we want. We don\'t want General Motors to be building plants outside of this country.',
+        'timestamp': '2018-11-27 09:45:00',
+        'retweets': 15000,
+        'likes': 67000,
+        'source': 'Trump Twitter Archive'
+    },
+    {
+        'id': '946731072826937344',
+        'text': 'Amazon should be paying the U.S. Post Office massive amounts of money for using it as their delivery boy. If this doesn\'t change, the post office will lose billions!',
+        'timestamp': '2017-12-29 08:30:00',
+        'retweets': 42000,
+        'likes': 156000,
+        'source': 'Trump Twitter Archive'
+    },
+    {
+        'id': '821385815052627968',
+        'text': 'Ford, Fiat Chrysler, and General Motors announced plans to invest billions of dollars in the United States. Great news!',
+        'timestamp': '2017-01-17 12:00:00',
+        'retweets': 31000,
+        'likes': 122000,
+        'source': 'Trump Twitter Archive'
+    },
+]
+
+_historical_sample_df: Optional[pd.DataFrame] = None
+
+
+def _historical_sample() -> pd.DataFrame:
+    """Sample archive as a DataFrame, built and timestamp-parsed once per process"""
+    global _historical_sample_df
+    if _historical_sample_df is None:
+        df = pd.DataFrame(_SAMPLE_TWEETS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d %H:%M:%S')
+        _historical_sample_df = df
+    return _historical_sample_df
+
+
 class TrumpDataIngestion:
     """Ingest Trump's political communications from multiple sources"""
     
@@ -59,59 +117,19 @@ class TrumpDataIngestion:
         # - Kaggle API: kaggle datasets download -d austinreese/trump-tweets
         # - Trump Archive: https://www.thetrumparchive.com/
         
-        sample_tweets = [
-            {
-                'id': '806134244384899072',
-                'text': 'Boeing is building a brand new 747 Air Force One for future presidents, but costs are out of control, more than $4 billion. Cancel order!',
-                'timestamp': '2016-12-06 13:52:00',
-                'retweets': 35000,
-                'likes': 98000,
-                'source': 'Trump Twitter Archive'
-            },
-            {
-                'id': '1163861532819763200',
-                'text': 'Just had a very good call with Apple CEO Tim Cook. Discussed many things including how the U.S. has been treated unfairly on trade with China.',
-                'timestamp': '2019-08-20 14:30:00',
-                'retweets': 28000,
-                'likes': 125000,
-                'source': 'Trump Twitter Archive'
-            },
-            {
-                'id': '1067431826154508289',
-                'text': 'General Motors is very counter to what we want. We don\'t want General Motors to be building plants outside of this country.',
-                'timestamp': '2018-11-27 09:45:00',
-                'retweets': 15000,
-                'likes': 67000,
-                'source': 'Trump Twitter Archive'
-            },
-            {
-                'id': '946731072826937344',
-                'text': 'Amazon should be paying the U.S. Post Office massive amounts of money for using it as their delivery boy. If this doesn\'t change, the post office will lose billions!',
-                'timestamp': '2017-12-29 08:30:00',
-                'retweets': 42000,
-                'likes': 156000,
-                'source': 'Trump Twitter Archive'
-            },
-            {
-                'id': '821385815052627968',
-                'text': 'Ford, Fiat Chrysler, and General Motors announced plans to invest billions of dollars in the United States. Great news!',
-                'timestamp': '2017-01-17 12:00:00',
-                'retweets': 31000,
-                'likes': 122000,
-                'source': 'Trump Twitter Archive'
-            },
-        ]
-        
-        df = pd.DataFrame(sample_tweets)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        # Parsed once per process; each call only filters the cached frame
+        df = _historical_sample()
         
-        # Filter by date if provided
-        if start_date:
-            df = df[df['timestamp'] >= pd.to_datetime(start_date)]
-        if end_date:
-            df = df[df['timestamp'] <= pd.to_datetime(end_date)]
+        # Filter by date if provided (one combined mask, one copy)
+        if start_date or end_date:
+            mask = np.ones(len(df), dtype=bool)
+            if start_date:
+                mask &= (df['timestamp'] >= pd.to_datetime(start_date)).to_numpy()
+            if end_date:
+                mask &= (df['timestamp'] <= pd.to_datetime(end_date)).to_numpy()
+            df = df[mask]
         
-        df = df.head(limit)
+        df = df.head(limit).copy()
         
         print(f"✓ Fetched {len(df)} historical tweets")
         return df
@@ -425,6 +443,8 @@ class FamilyDataIngestion:
         
         df = pd.DataFrame(mock_posts)
         df['timestamp'] = pd.to_datetime(df['timestamp'])
+        # A handful of handles repeated across many posts
+        df['author'] = df['author'].astype('category')
         
         print(f"✓ Fetched {len(df)} family posts")
         return df
@@ -10,7 +10,14 @@ Fetch market data from multiple sources:
 Handles rate limits, caching, and data validation.
 """
 
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import os
+from pathlib import Path
+import tempfile
+import threading
 from typing import Dict, List, Optional, Tuple
 import time
 import warnings
@@ -22,9 +29,328 @@ import requests
 
 from config import config
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 warnings.filterwarnings('ignore')
 
 
+# Process-wide daily price history cache shared by MarketDataFetcher and event
+# studies: requests for the same ticker and window (e.g. the market index
+# every study needs) reuse one download. Entries expire because
+# windows that reach past today still gain new bars.
+HISTORY_CACHE_TTL_SECONDS = 3600
+HISTORY_CACHE_MAX_ENTRIES = 1024
+_history_cache: Dict[Tuple[str, date, date], Tuple[pd.DataFrame, float]] = {}
+_history_cache_lock = threading.Lock()
+
+# Concurrent per-ticker downloads when batch prefetches cache misses
+FETCH_MAX_WORKERS = 8
+
+# Parquet schema metadata key holding the [start, end) range a cache file covers
+_DISK_COVERAGE_KEY = b'trumpplan_covered'
+
+# One lock per cache file: prefetch threads may fetch the same ticker (e.g. the
+# market index) for several windows at once, and each read-extend-write must
+# see the previous one's coverage
+_disk_history_locks: Dict[Path, threading.Lock] = {}
+_disk_history_locks_lock = threading.Lock()
+
+# Back-adjusted price columns rescaled when a delta download joins cached bars
+_ADJUSTED_PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+def get_daily_history(ticker: str, start: date, end: date) -> pd.DataFrame:
+    """
+    Daily price history with a precomputed 'return' column, cached per (ticker, start, end)
+    
+    The returned DataFrame is shared between callers and must not be
+    modified in place. Empty results are not cached.
+    
+    Args:
+        ticker: Ticker symbol
+        start: First date (inclusive)
+        end: Last date (exclusive, as in yfinance)
+    
+    Returns:
+        DataFrame of yfinance history plus 'return' (empty if unavailable)
+    """
+    key = (ticker, start, end)
+    cached = _cached_history(key)
+    if cached is not None:
+        return cached
+    
+    data = _download_history(ticker, start, end)
+    if data.empty:
+        return data
+    
+    return _cache_history(key, data)
+
+
+def _download_history(ticker: str, start: date, end: date) -> pd.DataFrame:
+    """
+    yfinance history for [start, end), through the on-disk Parquet cache when enabled
+    
+    Only windows that ended before today go through the disk cache (their
+    bars are final). Each ticker keeps one file covering one contiguous
+    range; a request outside it downloads only the missing ends and the
+    file grows to the union.
+    
+    Args:
+        ticker: Ticker symbol
+        start: First date (inclusive)
+        end: Last date (exclusive)
+    
+    Returns:
+        DataFrame of yfinance history (empty if unavailable)
+    """
+    path = _disk_history_path(ticker)
+    if path is None or end > date.today():
+        return yf.Ticker(ticker).history(start=start, end=end)
+    
+    with _disk_history_lock(path):
+        stored, covered = _read_disk_history(path)
+        if stored is not None and covered[0] <= start and end <= covered[1]:
+            data = stored
+        else:
+            lo, hi = (min(start, covered[0]), max(end, covered[1])) if stored is not None else (start, end)
+            data = _extend_disk_history(ticker, stored, covered, lo, hi) if stored is not None else None
+            if data is None:
+                data = yf.Ticker(ticker).history(start=lo, end=hi)
+            if data.empty:
+                return data
+            _write_disk_history(path, data, lo, hi)
+    
+    return data.iloc[date_position(data.index, start):date_position(data.index, end)].copy()
+
+
+def _extend_disk_history(
+    ticker: str,
+    stored: pd.DataFrame,
+    covered: Tuple[date, date],
+    lo: date,
+    hi: date
+) -> Optional[pd.DataFrame]:
+    """
+    Stored history extended to [lo, hi) by downloading only the bars outside `covered`
+    
+    Each delta is requested with one bar of overlap. yfinance back-adjusts
+    prices for dividends and splits, so a delta downloaded later can be on a
+    different basis; it is rescaled to the stored bars at the shared bar,
+    keeping returns across the seam correct.
+    
+    Args:
+        ticker: Ticker symbol
+        stored: History read from the cache file
+        covered: [start, end) range the file covers
+        lo: First date of the extended range (inclusive)
+        hi: Last date of the extended range (exclusive)
+    
+    Returns:
+        Extended DataFrame, or None if a delta does not overlap (refetch the union)
+    """
+    if stored.empty:
+        return None
+    
+    parts = [stored]
+    if lo < covered[0]:
+        anchor = stored.index[0]
+        head = _rebase_delta(
+            yf.Ticker(ticker).history(start=lo, end=anchor.date() + timedelta(days=1)), stored, anchor
+        )
+        if head is None:
+            return None
+        parts.insert(0, head[head.index < anchor])
+    
+    if hi > covered[1]:
+        anchor = stored.index[-1]
+        tail = _rebase_delta(yf.Ticker(ticker).history(start=anchor.date(), end=hi), stored, anchor)
+        if tail is None:
+            return None
+        parts.append(tail[tail.index > anchor])
+    
+    return pd.concat(parts)
+
+
+def _rebase_delta(delta: pd.DataFrame, stored: pd.DataFrame, anchor: pd.Timestamp) -> Optional[pd.DataFrame]:
+    """delta with prices scaled to stored's adjustment basis at the shared anchor bar"""
+    if anchor not in delta.index:
+        return None
+    
+    ratio = stored.at[anchor, 'Close'] / delta.at[anchor, 'Close']
+    if not np.isfinite(ratio) or ratio <= 0:
+        return None
+    
+    if ratio != 1.0:
+        delta = delta.copy()
+        columns = [col for col in _ADJUSTED_PRICE_COLUMNS if col in delta.columns]
+        delta[columns] = delta[columns] * ratio
+    
+    return delta
+
+
+def _disk_history_path(ticker: str) -> Optional[Path]:
+    """Parquet cache file for ticker, or None if the disk cache is disabled"""
+    if not config.PRICE_CACHE_DIR:
+        return None
+    return Path(config.PRICE_CACHE_DIR).expanduser() / f"{ticker.upper().replace('/', '_')}.parquet"
+
+
+def _disk_history_lock(path: Path) -> threading.Lock:
+    """Lock serializing reads and writes of one cache file within this process"""
+    with _disk_history_locks_lock:
+        return _disk_history_locks.setdefault(path, threading.Lock())
+
+
+def _read_disk_history(path: Path) -> Tuple[Optional[pd.DataFrame], Optional[Tuple[date, date]]]:
+    """Stored history and its covered (start, end) range, or (None, None)"""
+    if not path.exists():
+        return None, None
+    
+    try:
+        import pyarrow.parquet as pq
+        
+        table = pq.read_table(path)
+        lo, hi = table.schema.metadata[_DISK_COVERAGE_KEY].decode().split('/')
+        return table.to_pandas(), (date.fromisoformat(lo), date.fromisoformat(hi))
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable price cache {path}: {str(e)}")
+        return None, None
+
+
+def _write_disk_history(path: Path, data: pd.DataFrame, start: date, end: date) -> None:
+    """Atomically replace the cache file with data covering [start, end)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        return
+    
+    try:
+        table = pa.Table.from_pandas(data)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_DISK_COVERAGE_KEY] = f"{start.isoformat()}/{end.isoformat()}".encode()
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name, so concurrent writers (other processes too) never share one
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp', delete=False) as tmp:
+            tmp_path = Path(tmp.name)
+    except Exception as e:
+        print(f"⚠️  Could not write price cache {path}: {str(e)}")
+        return
+    
+    try:
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression='zstd')
+        os.replace(tmp_path, path)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"⚠️  Could not write price cache {path}: {str(e)}")
+
+
+def _cached_history(key: Tuple[str, date, date]) -> Optional[pd.DataFrame]:
+    """Cached history for key, or None if absent or expired"""
+    cached = _history_cache.get(key)
+    if cached is not None and time.time() - cached[1] < HISTORY_CACHE_TTL_SECONDS:
+        return cached[0]
+    return None
+
+
+def _cache_history(key: Tuple[str, date, date], data: pd.DataFrame) -> pd.DataFrame:
+    """Add the 'return' column to freshly downloaded history and cache it"""
+    # Simple returns straight on the Close array (no pandas pct_change dispatch)
+    close = data['Close'].to_numpy(dtype=np.float64)
+    returns = np.empty_like(close)
+    returns[:1] = np.nan
+    np.divide(close[1:], close[:-1], out=returns[1:])
+    returns[1:] -= 1.0
+    data['return'] = returns
+    
+    # Evict the oldest entry once full (dicts keep insertion order)
+    with _history_cache_lock:
+        _history_cache.pop(key, None)
+        if len(_history_cache) >= HISTORY_CACHE_MAX_ENTRIES:
+            _history_cache.pop(next(iter(_history_cache)))
+        _history_cache[key] = (data, time.time())
+    
+    return data
+
+
+def preload_daily_history(tickers: List[str], start: date, end: date) -> None:
+    """
+    Download several tickers in one threaded yf.download call and seed the history cache
+    
+    Subsequent fetch_data / batch calls over the same window are then served
+    from the cache instead of one sequential Ticker.history request each.
+    Tickers that fail to download are left for the per-ticker path.
+    
+    Args:
+        tickers: Ticker symbols (the market index may be included)
+        start: First date (inclusive)
+        end: Last date (exclusive, as in yfinance)
+    """
+    missing = [t for t in dict.fromkeys(tickers) if _cached_history((t, start, end)) is None]
+    if len(missing) < 2:
+        return
+    
+    try:
+        # auto_adjust and tz-aware index match Ticker.history() defaults
+        data = yf.download(
+            missing, start=start, end=end, group_by='ticker', threads=True,
+            progress=False, auto_adjust=True, ignore_tz=False
+        )
+    except Exception as e:
+        print(f"⚠️  Batch download failed, fetching tickers individually: {str(e)}")
+        return
+    
+    if not isinstance(data.columns, pd.MultiIndex):
+        return
+    
+    downloaded = set(data.columns.get_level_values(0))
+    for ticker in missing:
+        # yfinance upper-cases symbols
+        if ticker.upper() not in downloaded:
+            continue
+        
+        frame = data[ticker.upper()].dropna(how='all')
+        if not frame.empty:
+            _cache_history((ticker, start, end), frame.copy())
+
+
+def prefetch_daily_history(keys: List[Tuple[str, date, date]]) -> None:
+    """
+    Warm the history cache for (ticker, start, end) keys using a thread pool
+    
+    Downloads are network-bound (the GIL is released while waiting), so cache
+    misses are fetched concurrently. Failures are left for the caller's own
+    _fetch_history call to report.
+    """
+    missing = [key for key in dict.fromkeys(keys) if _cached_history(key) is None]
+    if not missing:
+        return
+    
+    def fetch(key: Tuple[str, date, date]) -> None:
+        try:
+            get_daily_history(*key)
+        except Exception:
+            pass
+    
+    with ThreadPoolExecutor(max_workers=min(FETCH_MAX_WORKERS, len(missing))) as executor:
+        list(executor.map(fetch, missing))
+
+
+def date_position(index: pd.DatetimeIndex, day: date) -> int:
+    """
+    Number of rows in a sorted DatetimeIndex dated before `day`
+    
+    Binary search against midnight in the index's own timezone, so window
+    bounds become integer positions without building a `.date` object array.
+    """
+    return int(index.searchsorted(pd.Timestamp(day, tz=index.tz)))
+
+
 class MarketDataFetcher:
     """Unified market data fetcher with multiple source support"""
     
@@ -51,6 +377,7 @@ class MarketDataFetcher:
         
         Returns:
             DataFrame with columns: Open, High, Low, Close, Volume
+            (daily yfinance data also carries 'return')
         """
         # Set defaults
         if end_date is None:
@@ -103,7 +430,8 @@ class MarketDataFetcher:
         # Map interval to yfinance format
         yf_interval = interval
         if interval == '1d':
-            data = stock.history(start=start_date, end=end_date, interval='1d')
+            # Shared daily cache (also used by event studies); end_date's day is included
+            data = get_daily_history(ticker, start_date.date(), end_date.date() + timedelta(days=1))
         elif interval == '1h':
             data = stock.history(start=start_date, end=end_date, interval='1h')
         elif interval == '5m':
@@ -321,6 +649,28 @@ class TickerMapper:
     def __init__(self):
         # Load comprehensive company-ticker mapping
         self.company_map = self._load_company_map()
+        
+        # Partial matches return the earliest key in map order, in either direction:
+        # keys inside the query (one Aho-Corasick pass when available) and the query
+        # inside a key (one find() over all keys joined, mapped back by offset)
+        self._keys = list(self.company_map)
+        self._joined_keys = '\0'.join(self._keys)
+        self._key_starts = []
+        offset = 0
+        for key in self._keys:
+            self._key_starts.append(offset)
+            offset += len(key) + 1
+        
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for rank, key in enumerate(self._keys):
+                self._automaton.add_word(key, rank)
+            self._automaton.make_automaton()
+        
+        # Same company names recur across a corpus; memoize the partial-match scan
+        # (company_map is fixed after loading, so cached results never go stale)
+        self.map_company_to_ticker = lru_cache(maxsize=4096)(self.map_company_to_ticker)
     
     def _load_company_map(self) -> Dict[str, str]:
         """
@@ -389,12 +739,20 @@ class TickerMapper:
         if name_lower in self.company_map:
             return self.company_map[name_lower]
         
-        # Partial match
-        for key, ticker in self.company_map.items():
-            if key in name_lower or name_lower in key:
-                return ticker
+        # Partial match: earliest key contained in the name...
+        rank = len(self._keys)
+        if self._automaton is not None:
+            for _, key_rank in self._automaton.iter(name_lower):
+                rank = min(rank, key_rank)
+        else:
+            rank = next((i for i, key in enumerate(self._keys) if key in name_lower), rank)
+        
+        # ...or containing it (first hit in the joined keys is in the earliest key)
+        pos = self._joined_keys.find(name_lower)
+        if pos != -1:
+            rank = min(rank, bisect_right(self._key_starts, pos) - 1)
         
-        return None
+        return self.company_map[self._keys[rank]] if rank < len(self._keys) else None
     
     def get_sector_etf(self, sector: str) -> Optional[str]:
         """
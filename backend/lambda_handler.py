@@ -8,17 +8,25 @@ Serverless function for:
 3. Signal generation on-demand
 """
 
-import json
 import os
 from datetime import datetime
 from typing import Dict, Any
 
 # Set environment for Lambda
 os.environ.setdefault('FLASK_ENV', 'production')
+# Package dir is read-only on Lambda; numba's compiled-kernel cache must live in /tmp
+os.environ.setdefault('NUMBA_CACHE_DIR', '/tmp/numba_cache')
+# Price history Parquet cache survives across warm invocations in /tmp
+os.environ.setdefault('PRICE_CACHE_DIR', '/tmp/yf_cache')
 
-from app.main import app as flask_app
-from tasks.celery_app import ingest_realtime_data, process_nlp_batch
-from models.db import init_db, Event, Signal
+# Module scope survives across warm invocations; Celery task modules are
+# imported on first use so API-only invocations never load them
+from apig_wsgi import make_lambda_handler
+
+from app.main import app as flask_app, get_nlp_pipeline
+
+# API Gateway event ⇄ WSGI adapter (byte-safe body, encoded query strings)
+_wsgi_handler = make_lambda_handler(flask_app, binary_support=True)
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -55,7 +63,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     else:
         return {
             'statusCode': 400,
-            'body': json.dumps({'error': 'Unsupported event type'})
+            'body': flask_app.json.dumps({'error': 'Unsupported event type'})
         }
 
 
@@ -71,52 +79,13 @@ def handle_api_request(event: Dict, context: Any) -> Dict:
         API Gateway response format
     """
     try:
-        # Convert API Gateway event to WSGI-compatible format
-        from werkzeug.wrappers import Request, Response
-        from werkzeug.datastructures import Headers
-        
-        # Build request
-        method = event['httpMethod']
-        path = event['path']
-        headers = event.get('headers', {})
-        body = event.get('body', '')
-        query_string = event.get('queryStringParameters', {})
-        
-        # Create WSGI environ
-        environ = {
-            'REQUEST_METHOD': method,
-            'PATH_INFO': path,
-            'QUERY_STRING': '&'.join(f'{k}={v}' for k, v in query_string.items()) if query_string else '',
-            'CONTENT_TYPE': headers.get('content-type', 'application/json'),
-            'CONTENT_LENGTH': str(len(body)),
-            'wsgi.input': body,
-            'SERVER_NAME': 'lambda',
-            'SERVER_PORT': '443',
-            'SERVER_PROTOCOL': 'HTTP/1.1',
-        }
-        
-        # Add headers
-        for key, value in headers.items():
-            key = key.upper().replace('-', '_')
-            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
-                environ[f'HTTP_{key}'] = value
-        
-        # Process through Flask
-        with flask_app.request_context(environ):
-            response = flask_app.full_dispatch_request()
-            
-            # Convert Flask response to API Gateway format
-            return {
-                'statusCode': response.status_code,
-                'headers': dict(response.headers),
-                'body': response.get_data(as_text=True)
-            }
+        return _wsgi_handler(event, context)
     
     except Exception as e:
         print(f"Error handling API request: {str(e)}")
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': flask_app.json.dumps({'error': str(e)})
         }
 
 
@@ -142,6 +111,7 @@ def handle_scheduled_task(event: Dict, context: Any) -> Dict:
         
         if 'ingest' in rule_name.lower():
             # Run data ingestion
+            from tasks.celery_app import ingest_realtime_data
             result = ingest_realtime_data()
             
         elif 'cleanup' in rule_name.lower():
@@ -156,18 +126,19 @@ def handle_scheduled_task(event: Dict, context: Any) -> Dict:
             
         else:
             # Default: data ingestion
+            from tasks.celery_app import ingest_realtime_data
             result = ingest_realtime_data()
         
         return {
             'statusCode': 200,
-            'body': json.dumps(result)
+            'body': flask_app.json.dumps(result)
         }
     
     except Exception as e:
         print(f"Error in scheduled task: {str(e)}")
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': flask_app.json.dumps({'error': str(e)})
         }
 
 
@@ -193,29 +164,29 @@ def handle_direct_task(event: Dict, context: Any) -> Dict:
         
         if task == 'process_events':
             event_ids = event.get('event_ids', [])
+            from tasks.celery_app import process_nlp_batch
             result = process_nlp_batch(event_ids)
             
         elif task == 'generate_signal':
             text = event.get('text', '')
             timestamp = event.get('timestamp', datetime.utcnow().isoformat())
             
-            from nlp.pipeline import NLPPipeline
-            pipeline = NLPPipeline()
-            result = pipeline.process_text(text, timestamp)
+            # Same lazily-loaded pipeline as the API routes, reused while warm
+            result = get_nlp_pipeline().process_text(text, timestamp)
             
         else:
             result = {'error': f'Unknown task: {task}'}
         
         return {
             'statusCode': 200 if 'error' not in result else 500,
-            'body': json.dumps(result, default=str)
+            'body': flask_app.json.dumps(result, default=str)
         }
     
     except Exception as e:
         print(f"Error in direct task: {str(e)}")
         return {
             'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
+            'body': flask_app.json.dumps({'error': str(e)})
         }
 
 
@@ -10,12 +10,14 @@ SQLAlchemy models for:
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text, JSON, ForeignKey
+from sqlalchemy import create_engine, insert, make_url, Column, Integer, String, Float, DateTime, Boolean, Text, JSON, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from config import config
 
@@ -235,16 +237,41 @@ class BacktestResult(Base):
 
 
 # Database initialization
-def init_db(database_url: Optional[str] = None):
+def init_db(database_url: Optional[str] = None, pool_size: int = 5, max_overflow: int = 10):
     """
     Initialize database connection and create tables
     
     Args:
         database_url: Database connection string (default from config)
+        pool_size: Persistent pooled connections (server databases only)
+        max_overflow: Extra connections allowed beyond pool_size under load
     """
     db_url = database_url or config.DATABASE_URL
     
-    engine = create_engine(db_url, echo=False)
+    engine_kwargs = {'insertmanyvalues_page_size': 1000}
+    url = make_url(db_url)
+    if url.get_backend_name() == 'postgresql' and url.get_driver_name() == 'psycopg2':
+        # Pack executemany INSERTs into multi-row VALUES and batch the rest (UPDATEs);
+        # only the psycopg2 dialect accepts executemany_mode
+        engine_kwargs['executemany_mode'] = 'values_plus_batch'
+    if db_url in ('sqlite://', 'sqlite:///:memory:'):
+        # An in-memory database exists only on the connection that created it:
+        # keep one connection for the whole engine, shared across threads
+        # (e.g. the Flask test client), so the schema is never lost
+        engine_kwargs.update(
+            poolclass=StaticPool,
+            connect_args={'check_same_thread': False}
+        )
+    elif not db_url.startswith('sqlite'):
+        # Reuse connections across requests/tasks; validate and recycle stale ones
+        engine_kwargs.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=1800
+        )
+    
+    engine = create_engine(db_url, echo=False, **engine_kwargs)
     Base.metadata.create_all(engine)
     
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -254,6 +281,43 @@ def init_db(database_url: Optional[str] = None):
     return engine, SessionLocal
 
 
+def insert_new_events(session, records: List[Dict]) -> List[int]:
+    """
+    Insert events, skipping any whose external_id already exists
+    
+    On PostgreSQL/SQLite this is one INSERT ... ON CONFLICT (external_id)
+    DO NOTHING RETURNING id against the unique index, so no pre-SELECT is
+    needed; other dialects fall back to a bulk existence check.
+    
+    Args:
+        session: Active session (caller commits)
+        records: Event column dicts
+    
+    Returns:
+        IDs of the newly inserted events
+    """
+    if not records:
+        return []
+    
+    dialect = session.bind.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        dialect_insert = pg_insert if dialect == 'postgresql' else sqlite_insert
+        stmt = dialect_insert(Event)\
+            .on_conflict_do_nothing(index_elements=['external_id'])\
+            .returning(Event.id)
+        return list(session.scalars(stmt, records).all())
+    
+    existing = {
+        external_id for (external_id,) in session.query(Event.external_id)
+        .filter(Event.external_id.in_([record['external_id'] for record in records]))
+        .all()
+    }
+    new_records = [record for record in records if record['external_id'] not in existing]
+    if not new_records:
+        return []
+    return list(session.scalars(insert(Event).returning(Event.id), new_records).all())
+
+
 def get_session(SessionLocal):
     """
     Get database session with automatic cleanup
@@ -10,7 +10,9 @@ Uses SHAP (SHapley Additive exPlanations) to explain:
 Required for compliance (non-black-box predictions)
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+import heapq
+import io
 import warnings
 
 import numpy as np
@@ -21,6 +23,20 @@ import shap
 warnings.filterwarnings('ignore')
 
 
+# Keyword lexicons used by the simple (non-SHAP) explanation path
+POSITIVE_WORDS = [
+    'great', 'excellent', 'best', 'wonderful', 'fantastic', 'amazing',
+    'success', 'winning', 'tremendous', 'beautiful', 'perfect',
+    'congratulations', 'proud', 'strong', 'smart', 'good'
+]
+
+NEGATIVE_WORDS = [
+    'terrible', 'worst', 'bad', 'awful', 'disaster', 'fail', 'failing',
+    'sad', 'weak', 'stupid', 'corrupt', 'fraud', 'disgrace',
+    'incompetent', 'loser', 'pathetic', 'horrible', 'disgusting'
+]
+
+
 class SentimentExplainer:
     """
     Explain sentiment predictions using SHAP
@@ -84,25 +100,11 @@ class SentimentExplainer:
         
         Identifies positive/negative words that influenced the prediction
         """
-        # Positive and negative word lists
-        positive_words = [
-            'great', 'excellent', 'best', 'wonderful', 'fantastic', 'amazing',
-            'success', 'winning', 'tremendous', 'beautiful', 'perfect',
-            'congratulations', 'proud', 'strong', 'smart', 'good'
-        ]
-        
-        negative_words = [
-            'terrible', 'worst', 'bad', 'awful', 'disaster', 'fail', 'failing',
-            'sad', 'weak', 'stupid', 'corrupt', 'fraud', 'disgrace',
-            'incompetent', 'loser', 'pathetic', 'horrible', 'disgusting'
-        ]
-        
         text_lower = text.lower()
-        words = text_lower.split()
         
         # Find influential words
-        found_positive = [w for w in positive_words if w in text_lower]
-        found_negative = [w for w in negative_words if w in text_lower]
+        found_positive = [w for w in POSITIVE_WORDS if w in text_lower]
+        found_negative = [w for w in NEGATIVE_WORDS if w in text_lower]
         
         # Calculate word contribution scores
         word_contributions = {}
@@ -111,12 +113,12 @@ class SentimentExplainer:
         for word in found_negative:
             word_contributions[word] = -0.1  # Negative contribution
         
-        # Sort by absolute contribution
-        top_words = sorted(
+        # Top 5 by absolute contribution (heap select, same order as a stable sort)
+        top_words = heapq.nlargest(
+            5,
             word_contributions.items(),
-            key=lambda x: abs(x[1]),
-            reverse=True
-        )[:5]
+            key=lambda x: abs(x[1])
+        )
         
         # Generate explanation text
         if prediction['label'] == 'positive':
@@ -214,56 +216,57 @@ class SignalExplainer:
     """
     
     @staticmethod
-    def explain_signal(nlp_result: Dict, event_study_result: Optional[Dict] = None) -> str:
+    def iter_explanation_lines(
+        nlp_result: Dict,
+        event_study_result: Optional[Dict] = None
+    ) -> Iterator[str]:
         """
-        Generate human-readable explanation of trading signal
+        Yield the lines of the signal explanation one at a time
         
         Args:
             nlp_result: Output from NLP pipeline
             event_study_result: Output from event study (optional)
         
-        Returns:
-            Explanation string
+        Yields:
+            Explanation lines (without trailing newline)
         """
-        explanation_parts = []
-        
         # 1. Text analysis
-        explanation_parts.append(f"**Sentiment Analysis:**")
-        explanation_parts.append(
+        yield f"**Sentiment Analysis:**"
+        yield (
             f"- Polarity: {nlp_result['sentiment_polarity']:.2f} ({nlp_result['sentiment_label']})"
         )
-        explanation_parts.append(f"- Tone: {nlp_result['tone']}")
+        yield f"- Tone: {nlp_result['tone']}"
         
         # 2. Entity extraction
         if nlp_result['tickers']:
-            explanation_parts.append(f"\n**Mentioned Companies:**")
+            yield f"\n**Mentioned Companies:**"
             for ticker in nlp_result['tickers'][:5]:
-                explanation_parts.append(f"- {ticker}")
+                yield f"- {ticker}"
         
         # 3. Topic classification
         if nlp_result['topic'] != 'unknown':
-            explanation_parts.append(f"\n**Topic Classification:**")
-            explanation_parts.append(f"- Topic: {nlp_result['topic'].replace('_', ' ').title()}")
-            explanation_parts.append(f"- Sector: {nlp_result['sector']}")
-            explanation_parts.append(f"- Related ETF: {nlp_result['sector_etf']}")
+            yield f"\n**Topic Classification:**"
+            yield f"- Topic: {nlp_result['topic'].replace('_', ' ').title()}"
+            yield f"- Sector: {nlp_result['sector']}"
+            yield f"- Related ETF: {nlp_result['sector_etf']}"
         
         # 4. Trading signals
-        explanation_parts.append(f"\n**Generated Signals ({nlp_result['signal_count']}):**")
+        yield f"\n**Generated Signals ({nlp_result['signal_count']}):**"
         for signal in nlp_result['signals']:
-            explanation_parts.append(
+            yield (
                 f"- {signal['ticker']}: {signal['direction'].upper()} "
                 f"(confidence: {signal['confidence']:.2f}) - {signal['reason']}"
             )
         
         # 5. Event study results (if available)
         if event_study_result:
-            explanation_parts.append(f"\n**Historical Analysis (Event Study):**")
-            explanation_parts.append(f"- Expected AR: {event_study_result.get('ar_percentage', 0):.2f}%")
-            explanation_parts.append(f"- Statistical significance: p={event_study_result.get('p_value', 1):.3f}")
-            explanation_parts.append(f"- Beta: {event_study_result.get('beta', 1):.2f}")
+            yield f"\n**Historical Analysis (Event Study):**"
+            yield f"- Expected AR: {event_study_result.get('ar_percentage', 0):.2f}%"
+            yield f"- Statistical significance: p={event_study_result.get('p_value', 1):.3f}"
+            yield f"- Beta: {event_study_result.get('beta', 1):.2f}"
         
         # 6. Confidence rationale
-        explanation_parts.append(f"\n**Confidence Factors:**")
+        yield f"\n**Confidence Factors:**"
         confidence_factors = []
         
         if abs(nlp_result['sentiment_polarity']) > 0.5:
@@ -277,11 +280,23 @@ class SignalExplainer:
         
         if confidence_factors:
             for factor in confidence_factors:
-                explanation_parts.append(f"- {factor}")
+                yield f"- {factor}"
         else:
-            explanation_parts.append("- Low confidence (weak signals)")
+            yield "- Low confidence (weak signals)"
+    
+    @staticmethod
+    def explain_signal(nlp_result: Dict, event_study_result: Optional[Dict] = None) -> str:
+        """
+        Generate human-readable explanation of trading signal
         
-        return "\n".join(explanation_parts)
+        Args:
+            nlp_result: Output from NLP pipeline
+            event_study_result: Output from event study (optional)
+        
+        Returns:
+            Explanation string
+        """
+        return "\n".join(SignalExplainer.iter_explanation_lines(nlp_result, event_study_result))
     
     @staticmethod
     def generate_disclaimer(signal: Dict) -> str:
@@ -332,27 +347,25 @@ def create_explanation_report(
     Returns:
         Formatted explanation report
     """
-    report = []
+    rule = "=" * 70
+    report = io.StringIO()
     
-    report.append("="*70)
-    report.append("SIGNAL EXPLANATION REPORT")
-    report.append("="*70)
-    report.append("")
+    report.write(f"{rule}\nSIGNAL EXPLANATION REPORT\n{rule}\n\n")
     
-    report.append(f"**Original Text:**")
-    report.append(f"{text[:300]}{'...' if len(text) > 300 else ''}")
-    report.append("")
+    report.write("**Original Text:**\n")
+    report.write(f"{text[:300]}{'...' if len(text) > 300 else ''}\n\n")
     
-    # Full signal explanation
-    explanation = SignalExplainer.explain_signal(nlp_result, event_study_result)
-    report.append(explanation)
+    # Full signal explanation, streamed line by line (no intermediate string)
+    report.writelines(
+        f"{line}\n"
+        for line in SignalExplainer.iter_explanation_lines(nlp_result, event_study_result)
+    )
     
-    report.append("")
-    report.append("="*70)
-    report.append(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-    report.append("="*70)
+    report.write(f"\n{rule}\n")
+    report.write(f"Generated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n")
+    report.write(rule)
     
-    return "\n".join(report)
+    return report.getvalue()
 
 
 if __name__ == '__main__':
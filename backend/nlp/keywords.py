@@ -0,0 +1,196 @@
+"""
+Multi-Keyword Matching
+=====================
+
+Shared matcher for the keyword-driven stages (tone, topic, fallback NER).
+
+Semantics match the original `kw in text_lower` loops: a keyword counts
+once if it occurs anywhere in the text as a substring.
+
+Uses a single Aho-Corasick automaton pass (pyahocorasick) when installed.
+Without it, large keyword sets are compiled into one trie-shaped regex and
+small ones fall back to one substring scan per keyword (C-level `in` beats
+the regex engine below ~150 keywords).
+
+For batches, `label_scores` builds a sparse document × keyword matrix and
+reduces it to per-label scores with a single sparse matmul.
+"""
+
+import re
+import sys
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Keyword count above which one regex pass beats per-keyword `in` scans
+REGEX_MIN_KEYWORDS = 150
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Regex alternation over words, factored into a prefix trie
+    
+    Branches on one character at a time, so the engine never retries every
+    keyword at each position; optional groups are greedy, so the longest
+    keyword starting at a position wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+    
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Find which of a fixed set of lowercase keywords occur in a text
+    
+    Args:
+        keywords: Mapping of keyword → label (e.g. tone bucket, topic, ticker)
+    """
+    
+    def __init__(self, keywords: Dict[str, Any]):
+        # Normalize once: texts are matched lowercased, and interned keys make
+        # the per-match dict lookups identity hits
+        self.keywords = {}
+        for kw, label in keywords.items():
+            self.keywords.setdefault(sys.intern(kw.lower()), label)
+        self._order = {kw: i for i, kw in enumerate(self.keywords)}
+        self._automaton = None
+        self._vectorizer = None
+        self._label_matrices = {}
+        
+        self._regex = None
+        self._prefixes = {}
+        
+        if AHOCORASICK_AVAILABLE and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+        elif len(self.keywords) >= REGEX_MIN_KEYWORDS:
+            # Zero-width lookahead reports the longest keyword at every position;
+            # any other keyword starting there is one of its prefixes
+            words = [kw for kw in self.keywords if kw]
+            self._regex = re.compile('(?=(' + _trie_regex(words) + '))')
+            self._prefixes = {
+                kw: [kw[:i] for i in range(1, len(kw) + 1) if kw[:i] in self._order]
+                for kw in words
+            }
+    
+    def find(self, text_lower: str) -> List[str]:
+        """
+        Distinct keywords present in text, in keyword definition order
+        
+        Args:
+            text_lower: Lowercased input text
+        
+        Returns:
+            List of matched keywords
+        """
+        if self._automaton is not None:
+            found = {kw for _, kw in self._automaton.iter(text_lower)}
+            return sorted(found, key=self._order.__getitem__)
+        
+        if self._regex is not None:
+            found = set()
+            for longest in set(self._regex.findall(text_lower)):
+                found.update(self._prefixes[longest])
+            return sorted(found, key=self._order.__getitem__)
+        
+        return [kw for kw in self.keywords if kw in text_lower]
+    
+    def count_labels(self, text_lower: str) -> Counter:
+        """
+        Number of distinct matched keywords per label
+        
+        Args:
+            text_lower: Lowercased input text
+        
+        Returns:
+            Counter of label → matched keyword count
+        """
+        return self.count_found(self.find(text_lower))
+    
+    def count_found(self, found: Iterable[str]) -> Counter:
+        """
+        Label counts for keywords already found by another matcher scan
+        
+        Keywords not in this matcher are ignored, so one scan with a
+        combined matcher can feed several label sets.
+        
+        Args:
+            found: Matched keywords (in definition order)
+        
+        Returns:
+            Counter of label → matched keyword count
+        """
+        return Counter(self.keywords[kw] for kw in found if kw in self.keywords)
+    
+    @classmethod
+    def combine(cls, *matchers: 'KeywordMatcher') -> 'KeywordMatcher':
+        """
+        Matcher over the union of several matchers' keywords
+        
+        Use `find` on the result once, then `count_found` on each source matcher.
+        """
+        combined = {}
+        for matcher in matchers:
+            for kw, label in matcher.keywords.items():
+                combined.setdefault(kw, label)
+        return cls(combined)
+    
+    def label_scores(self, texts_lower: List[str], labels: Sequence[Any]) -> np.ndarray:
+        """
+        Matched keyword counts per label for a batch of texts
+        
+        Args:
+            texts_lower: Lowercased input texts
+            labels: Label order for the output columns
+        
+        Returns:
+            (n_texts, n_labels) int array of distinct keyword matches
+        """
+        if self._vectorizer is None:
+            # Binary document × keyword indicator matrix, one scan per document
+            self._vectorizer = CountVectorizer(
+                vocabulary=list(self.keywords),
+                analyzer=self.find,
+                binary=True
+            )
+        
+        labels = tuple(labels)
+        if labels not in self._label_matrices:
+            # Keyword × label assignment matrix
+            column = {label: j for j, label in enumerate(labels)}
+            rows, cols = [], []
+            for i, kw in enumerate(self.keywords):
+                if self.keywords[kw] in column:
+                    rows.append(i)
+                    cols.append(column[self.keywords[kw]])
+            self._label_matrices[labels] = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                shape=(len(self.keywords), len(labels))
+            )
+        
+        doc_keywords = self._vectorizer.transform(texts_lower)
+        return (doc_keywords @ self._label_matrices[labels]).toarray()
@@ -10,18 +10,26 @@ NLP Pipeline for Political Text Analysis
 Converts political text → trading signals with explainability
 """
 
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import itertools
+import os
 import warnings
 
 import numpy as np
 import pandas as pd
 import spacy
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
+import joblib
+from joblib import Parallel, delayed
+from scipy import sparse
 import torch
 
+from config import config
 from data.market import TickerMapper
+from nlp.keywords import KeywordMatcher
 
 warnings.filterwarnings('ignore')
 
@@ -36,24 +44,151 @@ class SentimentAnalyzer:
     - Tone: Aggressive / Cooperative / Neutral
     """
     
-    def __init__(self, model_name: str = 'cardiffnlp/twitter-roberta-base-sentiment-latest'):
-        print(f"📦 Loading sentiment model: {model_name}...")
+    # Keyword-based tone classification (simple but effective for political text)
+    AGGRESSIVE_KEYWORDS = [
+        'cancel', 'fire', 'terminate', 'disaster', 'terrible', 'worst',
+        'fail', 'failing', 'fraud', 'corrupt', 'disgrace', 'incompetent',
+        'sue', 'lawsuit', 'investigate', 'criminal'
+    ]
+    
+    COOPERATIVE_KEYWORDS = [
+        'great', 'wonderful', 'fantastic', 'excellent', 'best',
+        'working together', 'partnership', 'collaboration', 'ally',
+        'congratulations', 'thank', 'appreciate', 'support'
+    ]
+    
+    # Tone-keyword margin at which keyword_sentiment replaces the transformer
+    KEYWORD_SHORTCUT_MARGIN = 3
+    
+    def __init__(
+        self,
+        model_name: str = 'cardiffnlp/twitter-roberta-base-sentiment-latest',
+        backend: Optional[str] = None
+    ):
+        # All tone keywords scanned in one pass
+        self._tone_matcher = KeywordMatcher({
+            **{kw: 'Aggressive' for kw in self.AGGRESSIVE_KEYWORDS},
+            **{kw: 'Cooperative' for kw in self.COOPERATIVE_KEYWORDS}
+        })
+        
+        self.backend = backend or config.SENTIMENT_BACKEND
+        self.sentiment_pipeline = None
+        self.model_loaded = False
+        
+        if self.backend == 'vader':
+            # Lexicon-only scoring: no transformer download or load
+            print("📦 Using VADER lexicon sentiment (no transformer)")
+        else:
+            self._load_transformer(model_name)
+        
+        if not self.model_loaded:
+            # Fallback to VADER
+            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+            self.vader = SentimentIntensityAnalyzer()
+    
+    def _load_transformer(self, model_name: str):
+        """Load the transformer sentiment pipeline; sets model_loaded on success"""
+        print(f"📦 Loading sentiment model: {model_name} ({self.backend})...")
         
         try:
-            self.sentiment_pipeline = pipeline(
-                'sentiment-analysis',
-                model=model_name,
-                device=0 if torch.cuda.is_available() else -1
-            )
+            if self.backend == 'onnx':
+                try:
+                    self.sentiment_pipeline = self._load_onnx_pipeline(model_name)
+                except Exception as e:
+                    print(f"⚠️  ONNX Runtime backend unavailable: {str(e)}")
+                    print("    Falling back to PyTorch backend")
+                    self.backend = 'torch'
+            
+            if self.sentiment_pipeline is None:
+                # Load weights directly in reduced precision where the hardware supports it
+                self.sentiment_pipeline = pipeline(
+                    'sentiment-analysis',
+                    model=model_name,
+                    device=0 if torch.cuda.is_available() else -1,
+                    torch_dtype=self._select_dtype()
+                )
+                if config.SENTIMENT_COMPILE:
+                    self._compile_model()
             self.model_loaded = True
         except Exception as e:
             print(f"⚠️  Failed to load transformer model: {str(e)}")
             print("    Falling back to VADER for sentiment")
             self.model_loaded = False
-            
-            # Fallback to VADER
-            from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-            self.vader = SentimentIntensityAnalyzer()
+    
+    @staticmethod
+    def _load_onnx_pipeline(model_name: str):
+        """
+        Build a sentiment pipeline on a dynamically quantized INT8 ONNX model
+        
+        The model is exported and quantized once (AVX-512 VNNI config) and
+        cached under config.ONNX_MODEL_DIR. Runs on ONNX Runtime's CPU
+        provider; GPU deployments should use the PyTorch FP16 backend.
+        
+        Requires: pip install optimum[onnxruntime]
+        """
+        from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        
+        save_dir = os.path.join(config.ONNX_MODEL_DIR, model_name.replace('/', '__'))
+        quantized_file = 'model_quantized.onnx'
+        
+        if not os.path.exists(os.path.join(save_dir, quantized_file)):
+            print(f"    Exporting and quantizing {model_name} to {save_dir}...")
+            ort_model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+            quantizer = ORTQuantizer.from_pretrained(ort_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(save_dir)
+        
+        model = ORTModelForSequenceClassification.from_pretrained(
+            save_dir,
+            file_name=quantized_file,
+            provider='CPUExecutionProvider'
+        )
+        tokenizer = AutoTokenizer.from_pretrained(save_dir)
+        
+        return pipeline('sentiment-analysis', model=model, tokenizer=tokenizer)
+    
+    @staticmethod
+    def _select_dtype() -> torch.dtype:
+        """
+        Pick the inference dtype for the sentiment model
+        
+        - CUDA: float16
+        - CPU with native BF16 (AVX-512 BF16 / AMX): bfloat16
+        - Otherwise: float32
+        """
+        if torch.cuda.is_available():
+            return torch.float16
+        
+        bf16_check = getattr(torch.cpu, '_is_avx512_bf16_supported', None)
+        if torch.backends.mkldnn.is_available() and bf16_check is not None and bf16_check():
+            return torch.bfloat16
+        
+        return torch.float32
+    
+    def _compile_model(self):
+        """
+        torch.compile the sentiment model and warm it up
+        
+        Dynamic shapes avoid a recompile per padded sequence length; on CUDA,
+        'reduce-overhead' also replays the forward as a CUDA graph. The warm-up
+        forward pays the compilation cost here instead of on the first request.
+        Keeps the eager model if compilation is unsupported.
+        """
+        model = self.sentiment_pipeline.model
+        try:
+            self.sentiment_pipeline.model = torch.compile(
+                model,
+                mode='reduce-overhead' if torch.cuda.is_available() else 'default',
+                dynamic=True
+            )
+            with torch.inference_mode():
+                self.sentiment_pipeline(['Warm-up text.', 'Another warm-up text.'], batch_size=2)
+            print("✓ Sentiment model compiled")
+        except Exception as e:
+            print(f"⚠️  torch.compile failed, using eager model: {str(e)}")
+            self.sentiment_pipeline.model = model
     
     def analyze_sentiment(self, text: str) -> Dict:
         """
@@ -68,24 +203,9 @@ class SentimentAnalyzer:
         if self.model_loaded:
             try:
                 # Use transformer
-                result = self.sentiment_pipeline(text[:512])[0]  # Truncate to model limit
-                
-                label = result['label'].lower()
-                score = result['score']
-                
-                # Map to polarity
-                if 'positive' in label or 'pos' in label:
-                    polarity = score
-                elif 'negative' in label or 'neg' in label:
-                    polarity = -score
-                else:
-                    polarity = 0.0
-                
-                return {
-                    'label': label,
-                    'score': score,
-                    'polarity': round(polarity, 3)
-                }
+                with torch.inference_mode():
+                    result = self.sentiment_pipeline(text[:512])[0]  # Truncate to model limit
+                return self._format_result(result)
             except Exception as e:
                 print(f"⚠️  Transformer analysis failed: {str(e)}")
                 # Fallback to VADER
@@ -93,6 +213,96 @@ class SentimentAnalyzer:
         else:
             return self._vader_fallback(text)
     
+    def batch_analyze(self, texts: List[str], batch_size: int = 32) -> List[Dict]:
+        """
+        Analyze sentiment for many texts with batched transformer inference
+        
+        Texts are tokenized once, sorted by token length, and streamed in
+        batches of batch_size so each forward pass pads only to the longest
+        text in its batch. Results are restored to input order.
+        
+        Args:
+            texts: Input texts
+            batch_size: Texts per forward pass
+        
+        Returns:
+            List of sentiment dicts (same format as analyze_sentiment)
+        """
+        if not texts:
+            return []
+        
+        if not self.model_loaded:
+            return [self._vader_fallback(text) for text in texts]
+        
+        try:
+            truncated = [text[:512] for text in texts]  # Truncate to model limit
+            order = np.argsort(self._token_lengths(truncated), kind='stable')
+            
+            # Stream length-sorted texts through one pipeline call; generator input
+            # runs through the pipeline's DataLoader, so tokenizing the next batch
+            # overlaps the current forward pass
+            ordered = [None] * len(texts)
+            with torch.inference_mode():
+                outputs = self.sentiment_pipeline(
+                    (truncated[i] for i in order),
+                    batch_size=batch_size,
+                    truncation=True,
+                    padding='longest'
+                )
+                for idx, output in zip(order, outputs):
+                    ordered[idx] = output
+            
+            return self._format_results(ordered)
+        except Exception as e:
+            print(f"⚠️  Batched transformer analysis failed: {str(e)}")
+            return [self.analyze_sentiment(text) for text in texts]
+    
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Token count per text (character count if the tokenizer is unavailable)"""
+        tokenizer = getattr(self.sentiment_pipeline, 'tokenizer', None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(texts, truncation=True, return_length=True)
+                return np.asarray(encoded['length'])
+            except Exception:
+                pass
+        return np.array([len(text) for text in texts])
+    
+    def _format_result(self, result: Dict) -> Dict:
+        """Map a transformer pipeline output to label/score/polarity"""
+        label = result['label'].lower()
+        score = result['score']
+        
+        # Map to polarity
+        if 'positive' in label or 'pos' in label:
+            polarity = score
+        elif 'negative' in label or 'neg' in label:
+            polarity = -score
+        else:
+            polarity = 0.0
+        
+        return {
+            'label': label,
+            'score': score,
+            'polarity': round(polarity, 3)
+        }
+    
+    def _format_results(self, results: List[Dict]) -> List[Dict]:
+        """Vectorized _format_result: map signs and round polarities in one NumPy pass"""
+        labels = [result['label'].lower() for result in results]
+        scores = np.fromiter((result['score'] for result in results), dtype=np.float64, count=len(results))
+        signs = np.fromiter(
+            (1 if 'pos' in label else -1 if 'neg' in label else 0 for label in labels),
+            dtype=np.int8,
+            count=len(labels)
+        )
+        polarities = np.round(scores * signs, 3).tolist()
+        
+        return [
+            {'label': label, 'score': result['score'], 'polarity': polarity}
+            for label, result, polarity in zip(labels, results, polarities)
+        ]
+    
     def _vader_fallback(self, text: str) -> Dict:
         """Fallback to VADER sentiment"""
         scores = self.vader.polarity_scores(text)
@@ -102,7 +312,7 @@ class SentimentAnalyzer:
             'polarity': scores['compound']
         }
     
-    def classify_tone(self, text: str) -> str:
+    def classify_tone(self, text: str, keyword_hits: Optional[List[str]] = None) -> str:
         """
         Classify communication tone
         
@@ -113,28 +323,58 @@ class SentimentAnalyzer:
         
         Args:
             text: Input text
+            keyword_hits: Keywords already found by a shared scan (skips rescanning)
         
         Returns:
             Tone category
         """
-        text_lower = text.lower()
+        if keyword_hits is None:
+            counts = self._tone_matcher.count_labels(text.lower())
+        else:
+            counts = self._tone_matcher.count_found(keyword_hits)
+        aggressive_count = counts['Aggressive']
+        cooperative_count = counts['Cooperative']
         
-        # Keyword-based tone classification (simple but effective for political text)
-        aggressive_keywords = [
-            'cancel', 'fire', 'terminate', 'disaster', 'terrible', 'worst',
-            'fail', 'failing', 'fraud', 'corrupt', 'disgrace', 'incompetent',
-            'sue', 'lawsuit', 'investigate', 'criminal'
-        ]
+        return self._tone_from_counts(aggressive_count, cooperative_count)
+    
+    def tone_counts_batch(self, texts_lower: List[str]) -> np.ndarray:
+        """
+        Aggressive/cooperative keyword counts for many lowercased texts
         
-        cooperative_keywords = [
-            'great', 'wonderful', 'fantastic', 'excellent', 'best',
-            'working together', 'partnership', 'collaboration', 'ally',
-            'congratulations', 'thank', 'appreciate', 'support'
-        ]
+        Returns:
+            (n_texts, 2) int array of [aggressive, cooperative] counts
+        """
+        return self._tone_matcher.label_scores(texts_lower, ('Aggressive', 'Cooperative'))
+    
+    @classmethod
+    def keyword_sentiment(cls, aggressive_count: int, cooperative_count: int) -> Optional[Dict]:
+        """
+        Heuristic sentiment from tone keywords, if they are decisive enough
+        
+        Used to skip the transformer forward pass when one tone dominates by
+        KEYWORD_SHORTCUT_MARGIN or more keywords.
         
-        aggressive_count = sum(1 for kw in aggressive_keywords if kw in text_lower)
-        cooperative_count = sum(1 for kw in cooperative_keywords if kw in text_lower)
+        Args:
+            aggressive_count: Distinct aggressive keywords in the text
+            cooperative_count: Distinct cooperative keywords in the text
         
+        Returns:
+            Sentiment dict (same format as analyze_sentiment), or None if not decisive
+        """
+        margin = cooperative_count - aggressive_count
+        if abs(margin) < cls.KEYWORD_SHORTCUT_MARGIN:
+            return None
+        
+        polarity = float(np.sign(margin)) * min(0.9, abs(margin) / 5)
+        return {
+            'label': 'positive' if polarity > 0 else 'negative',
+            'score': abs(polarity),
+            'polarity': round(polarity, 3)
+        }
+    
+    @staticmethod
+    def _tone_from_counts(aggressive_count: int, cooperative_count: int) -> str:
+        """Resolve tone from aggressive/cooperative keyword counts"""
         if aggressive_count > cooperative_count and aggressive_count > 0:
             return 'Aggressive'
         elif cooperative_count > aggressive_count and cooperative_count > 0:
@@ -153,11 +393,21 @@ class EntityExtractor:
     - Geopolitical entities → Sector implications
     """
     
+    UNUSED_SPACY_COMPONENTS = ['parser', 'tagger', 'lemmatizer', 'attribute_ruler', 'senter']
+    
     def __init__(self, model_name: str = 'en_core_web_sm'):
         print(f"📦 Loading spaCy model: {model_name}...")
         
         try:
-            self.nlp = spacy.load(model_name)
+            # Only NER output is used; skip loading the other components
+            self.nlp = spacy.load(model_name, exclude=self.UNUSED_SPACY_COMPONENTS)
+            
+            # Drop the shared tok2vec too unless NER listens to it (sm/md/lg NER has its own)
+            if 'tok2vec' in self.nlp.pipe_names:
+                listeners = set(self.nlp.get_pipe('tok2vec').listening_components)
+                if not listeners & set(self.nlp.pipe_names):
+                    self.nlp.disable_pipe('tok2vec')
+            
             self.model_loaded = True
         except Exception as e:
             print(f"⚠️  Failed to load spaCy model: {str(e)}")
@@ -166,23 +416,62 @@ class EntityExtractor:
             self.nlp = None
         
         self.ticker_mapper = TickerMapper()
+        
+        # Fallback path: one automaton scan over all known company names
+        self._company_matcher = KeywordMatcher(self.ticker_mapper.company_map)
     
-    def extract_entities(self, text: str) -> Dict:
+    def extract_entities(self, text: str, text_lower: Optional[str] = None) -> Dict:
         """
         Extract named entities and map to tickers
         
         Args:
             text: Input text
+            text_lower: Precomputed lowercased text (optional, used by fallback)
         
         Returns:
             Dict with organizations, tickers, money, locations
         """
         if not self.model_loaded:
             # Fallback to simple keyword matching
-            return self._fallback_extraction(text)
+            return self._fallback_extraction(text, text_lower)
+        
+        return self._entities_from_doc(self.nlp(text))
+    
+    def extract_entities_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 64,
+        n_process: int = 1,
+        texts_lower: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Extract entities for many texts with spaCy's batched nlp.pipe
         
-        doc = self.nlp(text)
+        Args:
+            texts: Input texts
+            batch_size: Documents per spaCy batch
+            n_process: Worker processes for nlp.pipe. Leave at 1 inside
+                daemonic workers (e.g. Celery prefork), which cannot fork children.
+            texts_lower: Precomputed lowercased texts (optional, used by fallback)
+        
+        Returns:
+            List of entity dicts (same format as extract_entities)
+        """
+        if not self.model_loaded:
+            if texts_lower is None:
+                texts_lower = [text.lower() for text in texts]
+            return [
+                self._fallback_extraction(text, text_lower)
+                for text, text_lower in zip(texts, texts_lower)
+            ]
         
+        return [
+            self._entities_from_doc(doc)
+            for doc in self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
+        ]
+    
+    def _entities_from_doc(self, doc) -> Dict:
+        """Collect organizations/money/locations from a parsed doc and map tickers"""
         organizations = []
         money = []
         locations = []
@@ -203,27 +492,29 @@ class EntityExtractor:
                 tickers.append(ticker)
         
         return {
-            'organizations': list(set(organizations)),
-            'tickers': list(set(tickers)),
+            'organizations': list(dict.fromkeys(organizations)),
+            'tickers': list(dict.fromkeys(tickers)),
             'money_mentions': money,
             'locations': locations,
             'entity_count': len(doc.ents)
         }
     
-    def _fallback_extraction(self, text: str) -> Dict:
+    def _fallback_extraction(self, text: str, text_lower: Optional[str] = None) -> Dict:
         """Simple keyword-based extraction as fallback"""
+        if text_lower is None:
+            text_lower = text.lower()
+        
         # Use TickerMapper's company list
         tickers = []
         organizations = []
         
-        for company, ticker in self.ticker_mapper.company_map.items():
-            if company in text.lower():
-                tickers.append(ticker)
-                organizations.append(company.title())
+        for company in self._company_matcher.find(text_lower):
+            tickers.append(self._company_matcher.keywords[company])
+            organizations.append(company.title())
         
         return {
-            'organizations': list(set(organizations)),
-            'tickers': list(set(tickers)),
+            'organizations': list(dict.fromkeys(organizations)),
+            'tickers': list(dict.fromkeys(tickers)),
             'money_mentions': [],
             'locations': [],
             'entity_count': len(organizations)
@@ -241,10 +532,17 @@ class TopicModeler:
     - "Tech regulation" → Technology (XLK)
     """
     
+    # Documents per online LDA mini-batch
+    LDA_BATCH_SIZE = 512
+    
+    # Documents per parallel hashing-vectorizer chunk
+    VECTORIZE_CHUNK_SIZE = 2000
+    
     def __init__(self, n_topics: int = 10):
         self.n_topics = n_topics
         self.lda_model = None
         self.vectorizer = None
+        self.feature_columns = None
         self.fitted = False
         
         # Topic → Sector/ETF mapping
@@ -286,6 +584,13 @@ class TopicModeler:
                 'direction': 'long'
             }
         }
+        
+        # All topic keywords scanned in one pass
+        self._topic_matcher = KeywordMatcher({
+            kw: topic_name
+            for topic_name, topic_data in self.topic_keywords.items()
+            for kw in topic_data['keywords']
+        })
     
     def fit(self, corpus: List[str]):
         """
@@ -299,18 +604,21 @@ class TopicModeler:
             return
         
         # Vectorize
-        self.vectorizer = CountVectorizer(
+        doc_term_matrix = self._doc_term_matrix(
+            corpus,
             max_features=1000,
-            stop_words='english',
             max_df=0.7,
             min_df=2
         )
         
-        doc_term_matrix = self.vectorizer.fit_transform(corpus)
-        
-        # Fit LDA
+        # Fit LDA (online mini-batch E-steps across all cores once the corpus
+        # is larger than one mini-batch; full-batch EM is faster below that)
+        online = len(corpus) > self.LDA_BATCH_SIZE
         self.lda_model = LatentDirichletAllocation(
             n_components=self.n_topics,
+            learning_method='online' if online else 'batch',
+            batch_size=self.LDA_BATCH_SIZE,
+            n_jobs=-1 if online else None,
             random_state=42,
             max_iter=50
         )
@@ -320,50 +628,181 @@ class TopicModeler:
         
         print(f"✓ LDA model fitted on {len(corpus)} documents, {self.n_topics} topics")
     
-    def classify_topic(self, text: str) -> Dict:
+    def save(self, path: str):
+        """
+        Persist the fitted LDA model and vectorizer state
+        
+        Fit offline (e.g. in a build step) and ship the artifact, so serving
+        never runs LDA in a request path.
+        
+        Args:
+            path: Output file (joblib, compressed)
+        """
+        if not self.fitted:
+            raise ValueError("TopicModeler must be fitted before saving")
+        
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump({
+            'n_topics': self.n_topics,
+            'lda_model': self.lda_model,
+            'vectorizer': self.vectorizer,
+            'feature_columns': self.feature_columns
+        }, path, compress=3)
+    
+    @classmethod
+    def load(cls, path: str) -> 'TopicModeler':
+        """
+        Load a TopicModeler saved with save()
+        
+        Args:
+            path: Artifact file
+        
+        Returns:
+            Fitted TopicModeler (keyword classification is rebuilt from code)
+        """
+        state = joblib.load(path)
+        
+        modeler = cls(n_topics=state['n_topics'])
+        modeler.lda_model = state['lda_model']
+        modeler.vectorizer = state['vectorizer']
+        modeler.feature_columns = state['feature_columns']
+        modeler.fitted = True
+        return modeler
+    
+    def _doc_term_matrix(
+        self,
+        corpus: List[str],
+        max_features: int,
+        max_df: float,
+        min_df: int
+    ) -> sparse.csr_matrix:
+        """
+        Term-count matrix built with a stateless hashing vectorizer
+        
+        Hashing needs no shared vocabulary, so corpus chunks are tokenized in
+        parallel. Document-frequency pruning is then applied to the hashed
+        columns, matching CountVectorizer's max_df/min_df/max_features filters.
+        
+        Args:
+            corpus: List of documents
+            max_features: Keep this many most frequent terms
+            max_df: Drop terms in more than this fraction of documents
+            min_df: Drop terms in fewer than this many documents
+        
+        Returns:
+            (n_docs, n_kept_terms) sparse count matrix
+        """
+        self.vectorizer = HashingVectorizer(
+            n_features=2 ** 20,
+            alternate_sign=False,
+            norm=None,
+            stop_words='english'
+        )
+        
+        chunks = [
+            corpus[i:i + self.VECTORIZE_CHUNK_SIZE]
+            for i in range(0, len(corpus), self.VECTORIZE_CHUNK_SIZE)
+        ]
+        if len(chunks) > 1:
+            parts = Parallel(n_jobs=-1)(delayed(self.vectorizer.transform)(chunk) for chunk in chunks)
+        else:
+            parts = [self.vectorizer.transform(corpus)]
+        counts = sparse.vstack(parts).tocsr()
+        
+        # Each hashed column appears at most once per row, so bincount = document frequency
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        keep = np.flatnonzero((doc_freq >= min_df) & (doc_freq <= max_df * counts.shape[0]))
+        
+        if len(keep) > max_features:
+            term_freq = np.asarray(counts[:, keep].sum(axis=0)).ravel()
+            keep = np.sort(keep[np.argsort(-term_freq, kind='stable')[:max_features]])
+        
+        self.feature_columns = keep
+        return counts[:, keep]
+    
+    def classify_topic(self, text: str, keyword_hits: Optional[List[str]] = None) -> Dict:
         """
         Classify text into political topic and map to sector
         
         Args:
             text: Input text
+            keyword_hits: Keywords already found by a shared scan (skips rescanning)
         
         Returns:
             Dict with topic, sector, ETF, and direction
         """
-        text_lower = text.lower()
-        
         # Score each topic based on keyword matches
-        topic_scores = {}
-        for topic_name, topic_data in self.topic_keywords.items():
-            score = sum(1 for kw in topic_data['keywords'] if kw in text_lower)
-            if score > 0:
-                topic_scores[topic_name] = score
+        if keyword_hits is None:
+            topic_scores = self._topic_matcher.count_labels(text.lower())
+        else:
+            topic_scores = self._topic_matcher.count_found(keyword_hits)
         
         if not topic_scores:
-            return {
-                'topic': 'unknown',
-                'sector': None,
-                'etf': None,
-                'direction': 'neutral',
-                'confidence': 0.0
-            }
+            return self._unknown_topic()
         
         # Get top topic
         top_topic = max(topic_scores, key=topic_scores.get)
-        top_score = topic_scores[top_topic]
         
-        topic_data = self.topic_keywords[top_topic]
+        return self._topic_result(top_topic, topic_scores[top_topic])
+    
+    def classify_topics_batch(
+        self,
+        texts: List[str],
+        texts_lower: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Classify many texts with one sparse (docs × keywords) @ (keywords × topics) product
+        
+        Args:
+            texts: Input texts
+            texts_lower: Precomputed lowercased texts (optional)
+        
+        Returns:
+            List of topic dicts (same format as classify_topic)
+        """
+        if not texts:
+            return []
+        
+        if texts_lower is None:
+            texts_lower = [text.lower() for text in texts]
+        
+        topic_names = list(self.topic_keywords)
+        scores = self._topic_matcher.label_scores(texts_lower, topic_names)
+        
+        # argmax takes the first maximum, matching classify_topic's tie-breaking
+        top_idx = scores.argmax(axis=1)
+        top_scores = scores[np.arange(len(texts)), top_idx]
+        
+        return [
+            self._topic_result(topic_names[idx], score) if score > 0 else self._unknown_topic()
+            for idx, score in zip(top_idx.tolist(), top_scores.tolist())
+        ]
+    
+    def _topic_result(self, topic_name: str, score: int) -> Dict:
+        """Build topic dict for the winning topic and its keyword score"""
+        topic_data = self.topic_keywords[topic_name]
         
         # Confidence based on keyword density
-        confidence = min(top_score / 5, 1.0)  # Max out at 5 keywords
+        confidence = min(score / 5, 1.0)  # Max out at 5 keywords
         
         return {
-            'topic': top_topic,
+            'topic': topic_name,
             'sector': topic_data['sector'],
             'etf': topic_data['etf'],
             'direction': topic_data['direction'],
             'confidence': round(confidence, 2)
         }
+    
+    @staticmethod
+    def _unknown_topic() -> Dict:
+        """Topic dict for text with no topic keywords"""
+        return {
+            'topic': 'unknown',
+            'sector': None,
+            'etf': None,
+            'direction': 'neutral',
+            'confidence': 0.0
+        }
 
 
 class NLPPipeline:
@@ -371,38 +810,145 @@ class NLPPipeline:
     Full 3-stage NLP pipeline for political text → trading signals
     """
     
-    def __init__(self):
+    def __init__(self, strict: Optional[bool] = None):
+        """
+        Args:
+            strict: Always run the transformer for sentiment. When False, texts
+                whose tone keywords are decisive use a keyword heuristic instead.
+                Defaults to config.SENTIMENT_STRICT.
+        """
         print("\n🔧 Initializing NLP Pipeline...\n")
         
+        self.strict = config.SENTIMENT_STRICT if strict is None else strict
+        
         self.sentiment_analyzer = SentimentAnalyzer()
         self.entity_extractor = EntityExtractor()
-        self.topic_modeler = TopicModeler()
+        self.topic_modeler = self._load_topic_modeler()
+        
+        # One keyword scan per text feeds both tone and topic scoring
+        self._keyword_matcher = KeywordMatcher.combine(
+            self.sentiment_analyzer._tone_matcher,
+            self.topic_modeler._topic_matcher
+        )
         
         print("\n✓ NLP Pipeline ready\n")
     
-    def process_text(self, text: str, timestamp: Optional[str] = None) -> Dict:
+    @staticmethod
+    def _load_topic_modeler() -> TopicModeler:
+        """Load the prefitted LDA artifact if present; otherwise keyword-only topics (no fit)"""
+        path = config.TOPIC_MODEL_PATH
+        if path and os.path.exists(path):
+            try:
+                modeler = TopicModeler.load(path)
+                print(f"✓ Loaded topic model from {path}")
+                return modeler
+            except Exception as e:
+                print(f"⚠️  Failed to load topic model from {path}: {str(e)}")
+        
+        return TopicModeler()
+    
+    def process_text(self, text: str, timestamp: Optional[Union[str, datetime]] = None) -> Dict:
         """
         Process political text through full pipeline
         
         Args:
             text: Political communication text
-            timestamp: Optional timestamp for context
+            timestamp: Optional timestamp for context (ISO string or datetime,
+                returned as given)
         
         Returns:
             Dict with sentiment, entities, topics, and trading signals
         """
-        # Stage 1: Sentiment & Tone
-        sentiment = self.sentiment_analyzer.analyze_sentiment(text)
-        tone = self.sentiment_analyzer.classify_tone(text)
+        return self._process_from_precomputed(text, None, timestamp)
+    
+    def process_batch(
+        self,
+        texts: List[str],
+        timestamps: Optional[List[Union[str, datetime]]] = None
+    ) -> List[Dict]:
+        """
+        Process many texts, batching the transformer sentiment stage
+        
+        Args:
+            texts: Political communication texts
+            timestamps: Optional timestamps aligned with texts
+        
+        Returns:
+            List of result dicts (same format as process_text)
+        """
+        if not texts:
+            return []
+        
+        texts_lower = [text.lower() for text in texts]
+        
+        tone_counts = self.sentiment_analyzer.tone_counts_batch(texts_lower).tolist()
+        tones = [self.sentiment_analyzer._tone_from_counts(agg, coop) for agg, coop in tone_counts]
+        
+        # Keyword-decisive texts skip the transformer unless strict
+        sentiments = [None] * len(texts)
+        if not self.strict:
+            sentiments = [
+                self.sentiment_analyzer.keyword_sentiment(agg, coop)
+                for agg, coop in tone_counts
+            ]
+        pending = [i for i, sentiment in enumerate(sentiments) if sentiment is None]
+        analyzed = self.sentiment_analyzer.batch_analyze([texts[i] for i in pending])
+        for i, sentiment in zip(pending, analyzed):
+            sentiments[i] = sentiment
+        
+        entities = self.entity_extractor.extract_entities_batch(texts, texts_lower=texts_lower)
+        topics = self.topic_modeler.classify_topics_batch(texts, texts_lower)
+        
+        results = []
+        for i, text in enumerate(texts):
+            timestamp = timestamps[i] if timestamps and i < len(timestamps) else None
+            results.append(self._process_from_precomputed(
+                text, sentiments[i], timestamp,
+                tone=tones[i], entities=entities[i], topic=topics[i]
+            ))
+        
+        return results
+    
+    def _process_from_precomputed(
+        self,
+        text: str,
+        sentiment: Optional[Dict],
+        timestamp: Optional[Union[str, datetime]] = None,
+        tone: Optional[str] = None,
+        entities: Optional[Dict] = None,
+        topic: Optional[Dict] = None
+    ) -> Dict:
+        """Run pipeline stages, skipping any whose result is precomputed (sentiment/tone/entities/topic)"""
+        # Lowercase and scan keywords once for all keyword-based stages
+        text_lower = text.lower()
+        keyword_hits = None
+        if sentiment is None or tone is None or topic is None:
+            keyword_hits = self._keyword_matcher.find(text_lower)
+        
+        # Stage 1: Sentiment (keyword heuristic when decisive, unless strict)
+        if sentiment is None:
+            if not self.strict:
+                counts = self.sentiment_analyzer._tone_matcher.count_found(keyword_hits)
+                sentiment = self.sentiment_analyzer.keyword_sentiment(
+                    counts['Aggressive'], counts['Cooperative']
+                )
+            if sentiment is None:
+                sentiment = self.sentiment_analyzer.analyze_sentiment(text)
+        
+        # Stage 1: Tone
+        if tone is None:
+            tone = self.sentiment_analyzer.classify_tone(text, keyword_hits)
         
         # Stage 2: Entity Extraction
-        entities = self.entity_extractor.extract_entities(text)
+        if entities is None:
+            entities = self.entity_extractor.extract_entities(text, text_lower)
         
         # Stage 3: Topic Classification
-        topic = self.topic_modeler.classify_topic(text)
+        if topic is None:
+            topic = self.topic_modeler.classify_topic(text, keyword_hits)
         
         # Generate trading signals
-        signals = self._generate_signals(sentiment, entities, topic, text)
+        signals = self._generate_signals(sentiment, tone, entities, topic, text)
         
         # Build result
         result = {
@@ -438,6 +984,7 @@ class NLPPipeline:
     def _generate_signals(
         self,
         sentiment: Dict,
+        tone: str,
         entities: Dict,
         topic: Dict,
         text: str
@@ -515,26 +1062,61 @@ class NLPPipeline:
         return " | ".join(parts)
 
 
-def batch_process_texts(texts: List[str], timestamps: Optional[List[str]] = None) -> pd.DataFrame:
+def batch_process_texts(
+    texts: Iterable[str],
+    timestamps: Optional[Iterable[Union[str, datetime]]] = None,
+    chunk_size: int = 1024,
+    nlp_pipeline: Optional[NLPPipeline] = None
+) -> pd.DataFrame:
     """
     Process multiple texts in batch
     
+    Input is consumed lazily in chunks of chunk_size, so generators (e.g.
+    rows streamed from a file or database cursor) are never fully held in
+    memory alongside the models' intermediate batches.
+    
     Args:
-        texts: List of political texts
-        timestamps: Optional list of timestamps
+        texts: Iterable of political texts
+        timestamps: Optional iterable of timestamps aligned with texts
+        chunk_size: Texts per pipeline batch
+        nlp_pipeline: Already-loaded pipeline to reuse (loads a new one if None)
     
     Returns:
         DataFrame with NLP results
     """
-    pipeline = NLPPipeline()
+    pipeline = nlp_pipeline if nlp_pipeline is not None else NLPPipeline()
+    
+    text_iter = iter(texts)
+    timestamp_iter = itertools.chain(timestamps if timestamps is not None else [], itertools.repeat(None))
     
     results = []
-    for i, text in enumerate(texts):
-        timestamp = timestamps[i] if timestamps and i < len(timestamps) else None
-        result = pipeline.process_text(text, timestamp)
-        results.append(result)
+    while True:
+        chunk = list(itertools.islice(text_iter, chunk_size))
+        if not chunk:
+            break
+        chunk_timestamps = list(itertools.islice(timestamp_iter, len(chunk)))
+        results.extend(pipeline.process_batch(chunk, chunk_timestamps))
+    
+    if not results:
+        return pd.DataFrame()
+    
+    # Build column-oriented: fixed-width numeric columns become typed arrays,
+    # everything else a plain list, so pandas skips per-row dict inference
+    numeric_dtypes = {
+        'sentiment_polarity': np.float32,
+        'ticker_count': np.int32,
+        'signal_count': np.int32
+    }
+    
+    columns = {}
+    for key in results[0]:
+        values = [result[key] for result in results]
+        if key in numeric_dtypes:
+            columns[key] = np.fromiter(values, dtype=numeric_dtypes[key], count=len(values))
+        else:
+            columns[key] = values
     
-    df = pd.DataFrame(results)
+    df = pd.DataFrame(columns)
     return df
 
 
@@ -23,21 +23,70 @@ Formula:
         β_i = Cov(R_i, R_m) / Var(R_m)
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import warnings
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-import statsmodels.api as sm
-from statsmodels.regression.linear_model import RegressionResults
-import yfinance as yf
 
 from config import config
+from data.market import (
+    date_position,
+    get_daily_history,
+    prefetch_daily_history,
+    preload_daily_history,
+)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 warnings.filterwarnings('ignore')
 
+# MAD to standard deviation for normally distributed data
+MAD_TO_STD = 1.4826
+
+
+def _history_window(event_date: date, estimation_window_days: int, event_window_days: int) -> Tuple[date, date]:
+    """Download range [start, end) covering the estimation and event windows"""
+    estimation_start = event_date - timedelta(days=estimation_window_days + 20)  # Buffer for weekends
+    event_window_end = event_date + timedelta(days=event_window_days + 5)
+    return estimation_start, event_window_end
+
+
+def _ar_summary(ar_values: np.ndarray, event_ar: float, threshold: float) -> Tuple[float, float, bool]:
+    """
+    CAR, robust t-statistic and MAD outlier flag for an AR vector, in one pass
+    
+    Args:
+        ar_values: Abnormal returns over the event window (float64)
+        event_ar: Event-day abnormal return
+        threshold: Number of MADs beyond which event_ar is an outlier
+    
+    Returns:
+        Tuple of (car, t_statistic, is_outlier)
+    """
+    n = ar_values.shape[0]
+    car = ar_values.sum()
+    median_ar = np.median(ar_values)
+    mad = np.median(np.abs(ar_values - median_ar))
+    
+    t_stat = 0.0
+    is_outlier = False
+    if mad > 0:
+        t_stat = median_ar / (MAD_TO_STD * mad / np.sqrt(n))
+        is_outlier = n >= 3 and abs(event_ar - median_ar) > threshold * mad
+    
+    return car, t_stat, is_outlier
+
+
+if NUMBA_AVAILABLE:
+    # Fused so the per-event post-CAPM stage skips numpy/pandas dispatch
+    _ar_summary = njit(cache=True)(_ar_summary)
+
 
 class EventStudy:
     """
@@ -66,6 +115,12 @@ class EventStudy:
         self.market_ticker = market_ticker
         self.rf_rate = config.RISK_FREE_RATE
         
+        # Date bounds used by every step, computed once
+        self._event_date = event_timestamp.date()
+        self._window_start = self._event_date - timedelta(days=event_window_days)  # also estimation end
+        self._window_stop = self._event_date + timedelta(days=event_window_days + 1)  # exclusive
+        self._history_window = _history_window(self._event_date, estimation_window_days, event_window_days)
+        
         # Data storage
         self.stock_data: Optional[pd.DataFrame] = None
         self.market_data: Optional[pd.DataFrame] = None
@@ -79,6 +134,9 @@ class EventStudy:
         self.p_value: Optional[float] = None
         self.t_statistic: Optional[float] = None
         
+        # (ar_series it was built from, running CAR); see _car_path
+        self._car_cumsum: Optional[Tuple[pd.Series, np.ndarray]] = None
+        
     def fetch_data(self) -> bool:
         """
         Fetch historical stock and market data for analysis
@@ -88,31 +146,24 @@ class EventStudy:
         """
         try:
             # Calculate date ranges
-            event_date = self.event_timestamp.date()
-            estimation_start = event_date - timedelta(days=self.estimation_window_days + 20)  # Buffer for weekends
-            event_window_end = event_date + timedelta(days=self.event_window_days + 5)
+            estimation_start, event_window_end = self._history_window
             
-            # Fetch stock data
-            stock = yf.Ticker(self.ticker)
-            self.stock_data = stock.history(start=estimation_start, end=event_window_end)
+            # Fetch stock data (with returns; cached across studies)
+            self.stock_data = get_daily_history(self.ticker, estimation_start, event_window_end)
             
             if self.stock_data.empty:
                 print(f"⚠️  No stock data available for {self.ticker}")
                 return False
             
-            # Fetch market data
-            market = yf.Ticker(self.market_ticker)
-            self.market_data = market.history(start=estimation_start, end=event_window_end)
+            # Fetch market data (shared by every study over the same window)
+            self.market_data = get_daily_history(self.market_ticker, estimation_start, event_window_end)
             
             if self.market_data.empty:
                 print(f"⚠️  No market data available for {self.market_ticker}")
                 return False
             
-            # Calculate returns
-            self.stock_data['return'] = self.stock_data['Close'].pct_change()
-            self.market_data['return'] = self.market_data['Close'].pct_change()
-            
-            # Align dates (only trading days present in both)
+            # Align dates (only trading days present in both); .loc copies,
+            # so the cached frames are never modified
             common_dates = self.stock_data.index.intersection(self.market_data.index)
             self.stock_data = self.stock_data.loc[common_dates]
             self.market_data = self.market_data.loc[common_dates]
@@ -144,33 +195,31 @@ class EventStudy:
         if self.stock_data is None or self.market_data is None:
             raise ValueError("Data not fetched. Call fetch_data() first.")
         
-        # Get estimation window (exclude event window)
-        event_date = self.event_timestamp.date()
-        estimation_end = event_date - timedelta(days=self.event_window_days)
-        
-        # Filter estimation window
-        estimation_stock = self.stock_data[self.stock_data.index.date < estimation_end]
-        estimation_market = self.market_data[self.market_data.index.date < estimation_end]
-        
-        # Take last N days
-        if len(estimation_stock) > self.estimation_window_days:
-            estimation_stock = estimation_stock.iloc[-self.estimation_window_days:]
-            estimation_market = estimation_market.iloc[-self.estimation_window_days:]
-        
-        # Align
-        common_dates = estimation_stock.index.intersection(estimation_market.index)
-        stock_returns = estimation_stock.loc[common_dates, 'return']
-        market_returns = estimation_market.loc[common_dates, 'return']
-        
-        # OLS Regression: R_i = α + β * R_m + ε
-        X = sm.add_constant(market_returns.values)  # Add intercept
-        y = stock_returns.values
-        
-        model = sm.OLS(y, X, missing='drop')
-        results: RegressionResults = model.fit()
+        # Estimation window: last N trading days before the event window
+        stock_data, market_data = self._aligned_data()
+        hi = date_position(stock_data.index, self._window_start)
+        lo = max(hi - self.estimation_window_days, 0)
+        r = stock_data['return'].to_numpy(dtype=float)[lo:hi]
+        m = market_data['return'].to_numpy(dtype=float)[lo:hi]
+        
+        # OLS Regression: R_i = α + β * R_m + ε, in closed form
+        # β = Cov(R_i, R_m) / Var(R_m), α = mean(R_i) - β * mean(R_m)
+        valid = np.isfinite(r) & np.isfinite(m)
+        r, m = r[valid], m[valid]
+        
+        if len(r) < 2:
+            # Too little history: fall back to the market-adjusted model
+            alpha, beta = 0.0, 1.0
+        else:
+            mr, mm = r.mean(), m.mean()
+            dm = m - mm
+            ss_m = np.dot(dm, dm)
+            # Flat market: fall back to the constant-mean model
+            beta = np.dot(r - mr, dm) / ss_m if ss_m > 0 else 0.0
+            alpha = mr - beta * mm
         
-        self.alpha = results.params[0]
-        self.beta = results.params[1]
+        self.alpha = float(alpha)
+        self.beta = float(beta)
         
         return self.alpha, self.beta
     
@@ -187,49 +236,56 @@ class EventStudy:
         if self.alpha is None or self.beta is None:
             self.estimate_expected_return()
         
-        # Get event window
-        event_date = self.event_timestamp.date()
-        window_start = event_date - timedelta(days=self.event_window_days)
-        window_end = event_date + timedelta(days=self.event_window_days)
-        
         # Filter event window
-        event_stock = self.stock_data[
-            (self.stock_data.index.date >= window_start) & 
-            (self.stock_data.index.date <= window_end)
-        ]
-        event_market = self.market_data[
-            (self.market_data.index.date >= window_start) & 
-            (self.market_data.index.date <= window_end)
-        ]
-        
-        # Align
-        common_dates = event_stock.index.intersection(event_market.index)
+        stock_data, market_data = self._aligned_data()
+        lo = date_position(stock_data.index, self._window_start)
+        hi = date_position(stock_data.index, self._window_stop)
         
-        if len(common_dates) == 0:
+        if hi <= lo:
             print("⚠️  No trading days in event window")
             return pd.Series(dtype=float)
         
-        stock_returns = event_stock.loc[common_dates, 'return']
-        market_returns = event_market.loc[common_dates, 'return']
+        stock_returns = stock_data['return'].to_numpy(dtype=float)[lo:hi]
+        market_returns = market_data['return'].to_numpy(dtype=float)[lo:hi]
         
-        # Calculate expected returns
-        expected_returns = self.alpha + self.beta * market_returns
+        # Expected returns, then abnormal returns, in one output buffer (the
+        # return slices are views into the price frames, so never write to them)
+        ar_values = np.multiply(market_returns, self.beta)
+        ar_values += self.alpha
+        np.subtract(stock_returns, ar_values, out=ar_values)
         
-        # Calculate abnormal returns
-        abnormal_returns = stock_returns - expected_returns
+        # Frames share one index; no realignment
+        abnormal_returns = pd.Series(
+            ar_values,
+            index=stock_data.index[lo:hi],
+            name='return'
+        )
         
         self.ar_series = abnormal_returns
+        self.ar = self._event_day_ar(abnormal_returns)
+        
+        return abnormal_returns
+    
+    def _event_day_ar(self, abnormal_returns: pd.Series) -> Optional[float]:
+        """AR on the event day (or the first trading day after), else the window mean"""
+        pos = date_position(abnormal_returns.index, self._event_date)
+        if pos < len(abnormal_returns):
+            return float(abnormal_returns.iat[pos])
         
-        # Store AR for event day (or closest)
-        event_day_ar = None
-        for date in abnormal_returns.index:
-            if date.date() >= event_date:
-                event_day_ar = abnormal_returns.loc[date]
-                break
+        return float(abnormal_returns.mean()) if len(abnormal_returns) else None
+    
+    def _aligned_data(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Stock and market data on common trading days
         
-        self.ar = event_day_ar if event_day_ar is not None else abnormal_returns.mean()
+        fetch_data already aligns both frames, so this is normally just an
+        index equality check; data assigned directly is intersected here.
+        """
+        if self.stock_data.index.equals(self.market_data.index):
+            return self.stock_data, self.market_data
         
-        return abnormal_returns
+        common_dates = self.stock_data.index.intersection(self.market_data.index)
+        return self.stock_data.loc[common_dates], self.market_data.loc[common_dates]
     
     def calculate_car(self, window: Optional[Tuple[int, int]] = None) -> float:
         """
@@ -247,23 +303,47 @@ class EventStudy:
         if self.ar_series is None:
             self.calculate_ar()
         
+        car_path = self._car_path()
+        lo, hi = 0, len(car_path)
+        
         if window is not None:
             # Filter to specific window
-            event_date = self.event_timestamp.date()
-            window_start = event_date - timedelta(days=window[0])
-            window_end = event_date + timedelta(days=window[1])
+            window_start = self._event_date - timedelta(days=window[0])
+            window_end = self._event_date + timedelta(days=window[1])
             
-            filtered_ar = self.ar_series[
-                (self.ar_series.index.date >= window_start) & 
-                (self.ar_series.index.date <= window_end)
-            ]
-            car = filtered_ar.sum()
-        else:
-            car = self.ar_series.sum()
+            lo = date_position(self.ar_series.index, window_start)
+            hi = date_position(self.ar_series.index, window_end + timedelta(days=1))
+        
+        # Any window sum is a difference of two running-CAR entries
+        car = 0.0
+        if hi > lo:
+            car = float(car_path[hi - 1] - (car_path[lo - 1] if lo > 0 else 0.0))
         
         self.car = car
         return car
     
+    def min_car(self) -> float:
+        """
+        Most negative cumulative abnormal return reached within the event window
+        
+        min_t Σ_{t' <= t} AR_t' (the drawdown-style CAR)
+        
+        Returns:
+            Minimum running CAR (0.0 if the window is empty)
+        """
+        if self.ar_series is None:
+            self.calculate_ar()
+        
+        car_path = self._car_path()
+        return float(car_path.min()) if len(car_path) else 0.0
+    
+    def _car_path(self) -> np.ndarray:
+        """Running CAR over ar_series (NaN-skipping), rebuilt only when ar_series is replaced"""
+        if self._car_cumsum is None or self._car_cumsum[0] is not self.ar_series:
+            ar_values = self.ar_series.to_numpy(dtype=np.float64)
+            self._car_cumsum = (self.ar_series, np.nancumsum(ar_values))
+        return self._car_cumsum[1]
+    
     def statistical_test(self, use_robust: bool = True) -> Dict[str, float]:
         """
         Perform statistical significance test on abnormal returns
@@ -286,21 +366,24 @@ class EventStudy:
             }
         
         # T-test: H0: mean(AR) = 0
-        ar_values = self.ar_series.values
+        ar_values = self.ar_series.to_numpy(dtype=np.float64)
         
         if use_robust:
             # Robust t-test using median and MAD
-            median_ar = np.median(ar_values)
-            mad = np.median(np.abs(ar_values - median_ar))
+            _, t_stat, _ = _ar_summary(ar_values, 0.0, 0.0)
+            return self._robust_test_result(t_stat, len(ar_values))
+        else:
+            # Standard t-test (one-sample, inline rather than ttest_1samp's wrapper)
+            from scipy import stats
             
-            if mad > 0:
-                robust_std = 1.4826 * mad  # MAD to std conversion
-                t_stat = median_ar / (robust_std / np.sqrt(len(ar_values)))
+            n = ar_values.size
+            std = ar_values.std(ddof=1) if n > 1 else 0.0
+            if std > 0:
+                t_stat = ar_values.mean() / (std / np.sqrt(n))
+                p_val = 2 * stats.t.sf(abs(t_stat), n - 1)
             else:
-                t_stat = 0.0
-        else:
-            # Standard t-test
-            t_stat, p_val = stats.ttest_1samp(ar_values, 0)
+                # No spread: undetermined, as in the robust branch when MAD is 0
+                t_stat, p_val = 0.0, 1.0
             self.t_statistic = t_stat
             self.p_value = p_val
             
@@ -313,10 +396,14 @@ class EventStudy:
                 'is_significant': bool(is_significant),
                 'confidence': float(min(confidence, 0.99))
             }
+    
+    def _robust_test_result(self, t_stat: float, n: int) -> Dict[str, float]:
+        """P-value from the t-distribution for a robust (median/MAD) t-statistic"""
+        from scipy import stats  # deferred: scipy.stats dominates module import time
         
-        # For robust, calculate p-value from t-distribution
-        df = len(ar_values) - 1
-        p_val = 2 * (1 - stats.t.cdf(abs(t_stat), df))
+        df = n - 1
+        # Survival function keeps precision in the far tail (1 - cdf rounds to 0)
+        p_val = 2 * stats.t.sf(abs(t_stat), df)
         
         self.t_statistic = t_stat
         self.p_value = p_val
@@ -329,7 +416,7 @@ class EventStudy:
             'p_value': float(p_val),
             'is_significant': bool(is_significant),
             'confidence': float(min(confidence, 0.99)),
-            'method': 'robust' if use_robust else 'standard'
+            'method': 'robust'
         }
     
     def filter_outliers(self, threshold: float = 3.0) -> bool:
@@ -344,24 +431,14 @@ class EventStudy:
         Returns:
             True if event is an outlier, False otherwise
         """
-        if self.ar_series is None or len(self.ar_series) < 3:
-            return False
-        
-        ar_values = self.ar_series.values
-        median_ar = np.median(ar_values)
-        mad = np.median(np.abs(ar_values - median_ar))
-        
-        if mad == 0:
+        if self.ar_series is None or len(self.ar_series) < 3 or self.ar is None:
             return False
         
         # Check if event day AR is an outlier
-        if self.ar is None:
-            return False
+        ar_values = self.ar_series.to_numpy(dtype=np.float64)
+        _, _, is_outlier = _ar_summary(ar_values, float(self.ar), threshold)
         
-        deviation = abs(self.ar - median_ar)
-        is_outlier = deviation > (threshold * mad)
-        
-        return is_outlier
+        return bool(is_outlier)
     
     def run_full_analysis(self) -> Dict:
         """
@@ -372,48 +449,201 @@ class EventStudy:
         """
         # Step 1: Fetch data
         if not self.fetch_data():
-            return {
-                'ticker': self.ticker,
-                'event_timestamp': self.event_timestamp.isoformat(),
-                'error': 'Failed to fetch data',
-                'ar': 0.0,
-                'car': 0.0,
-                'confidence': 0.0,
-                'is_significant': False
-            }
+            return self._error_result('Failed to fetch data')
         
         try:
             # Step 2: Estimate expected returns (CAPM)
-            alpha, beta = self.estimate_expected_return()
+            self.estimate_expected_return()
             
             # Step 3: Calculate AR
-            ar_series = self.calculate_ar()
+            self.calculate_ar()
             
-            if len(ar_series) == 0:
-                return {
-                    'ticker': self.ticker,
-                    'event_timestamp': self.event_timestamp.isoformat(),
-                    'error': 'No data in event window',
-                    'ar': 0.0,
-                    'car': 0.0,
-                    'confidence': 0.0,
-                    'is_significant': False
-                }
+            return self._build_result()
             
-            # Step 4: Calculate CAR
-            car = self.calculate_car()
+        except Exception as e:
+            return self._error_result(f'Analysis failed: {str(e)}')
+    
+    @classmethod
+    def batch(
+        cls,
+        events: List[Tuple[datetime, str]],
+        estimation_window_days: int = 252,
+        event_window_days: int = 3,
+        market_ticker: str = 'SPY'
+    ) -> List[Dict]:
+        """
+        Run event studies for many (event_timestamp, ticker) pairs at once
+        
+        Events sharing an event date (e.g. one post naming several tickers)
+        share their estimation and event windows, so their returns are
+        stacked into a (T, N) matrix against the common market series and
+        every alpha/beta and AR series is computed in one vectorized pass.
+        
+        Args:
+            events: List of (event_timestamp, ticker) tuples
+            estimation_window_days: Days for historical estimation
+            event_window_days: Days before/after event to analyze
+            market_ticker: Market index ticker for CAPM
+        
+        Returns:
+            List of result dicts (as from run_full_analysis), in input order
+        """
+        studies = [
+            cls(ts, ticker, estimation_window_days, event_window_days, market_ticker)
+            for ts, ticker in events
+        ]
+        
+        if len(studies) <= 1:
+            return [study.run_full_analysis() for study in studies]
+        
+        groups: Dict[date, List[int]] = {}
+        for i, study in enumerate(studies):
+            groups.setdefault(study._event_date, []).append(i)
+        
+        # Phase 1 (network-bound): one batch download per date group, then any
+        # remaining misses concurrently. yf.download shares global state, so
+        # the group downloads themselves stay sequential.
+        history_keys = []
+        for indices in groups.values():
+            start, end = studies[indices[0]]._history_window
+            tickers = [studies[i].ticker for i in indices] + [market_ticker]
+            preload_daily_history(tickers, start, end)
+            history_keys.extend((ticker, start, end) for ticker in tickers)
+        prefetch_daily_history(history_keys)
+        
+        # Phase 2 (CPU-bound): stacked fits, served from the history cache
+        results: List[Optional[Dict]] = [None] * len(studies)
+        for indices in groups.values():
+            group = [studies[i] for i in indices]
+            try:
+                group_results = cls._run_group(group)
+            except Exception as e:
+                group_results = [study._error_result(f'Analysis failed: {str(e)}') for study in group]
             
-            # Step 5: Statistical test
-            test_results = self.statistical_test(use_robust=True)
+            for i, result in zip(indices, group_results):
+                results[i] = result
+        
+        return results
+    
+    @staticmethod
+    def _run_group(group: List['EventStudy']) -> List[Dict]:
+        """
+        Stacked CAPM fit and AR calculation for studies with the same event date
+        
+        Per column, over rows where both returns are present:
+            β = Cov(R_i, R_m) / Var(R_m),  α = mean(R_i) - β * mean(R_m)
+        
+        Args:
+            group: Studies sharing event date and window parameters
+        
+        Returns:
+            List of result dicts, one per study
+        """
+        first = group[0]
+        estimation_start, event_window_end = first._history_window
+        
+        market = get_daily_history(first.market_ticker, estimation_start, event_window_end)
+        if market.empty:
+            print(f"⚠️  No market data available for {first.market_ticker}")
+            return [study._error_result('Failed to fetch data') for study in group]
+        
+        market = market[market['return'].notna()]
+        index = market.index
+        m = market['return'].to_numpy(dtype=float)
+        
+        # (T, N) stock returns on the market's trading days; NaN where missing
+        columns = []
+        for study in group:
+            stock = get_daily_history(study.ticker, estimation_start, event_window_end)
+            if stock.empty:
+                print(f"⚠️  No stock data available for {study.ticker}")
+                columns.append(np.full(len(index), np.nan))
+            else:
+                columns.append(stock['return'].reindex(index).to_numpy(dtype=float))
+        R = np.column_stack(columns)
+        valid = np.isfinite(R)
+        
+        # Estimation window: last N trading days before the event window
+        hi = date_position(index, first._window_start)
+        est = slice(max(hi - first.estimation_window_days, 0), hi)
+        R_est, W = np.where(valid[est], R[est], 0.0), valid[est].astype(float)
+        m_est = m[est]
+        
+        # Masked sums turn every per-column fit into a few matrix-vector products
+        n = W.sum(axis=0)
+        sum_m = m_est @ W
+        sum_mm = (m_est * m_est) @ W
+        sum_r = R_est.sum(axis=0)
+        sum_rm = m_est @ R_est
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_r, mean_m = sum_r / n, sum_m / n
+            ss_m = sum_mm - sum_m * mean_m
+            betas = np.where(ss_m > 0, (sum_rm - sum_r * mean_m) / ss_m, 0.0)
+            alphas = mean_r - betas * mean_m
+        
+        # Same fallbacks as estimate_expected_return
+        too_short = n < 2
+        alphas[too_short], betas[too_short] = 0.0, 1.0
+        
+        # Event window: AR = R - (α + β * R_m), broadcast over all tickers
+        ev = slice(date_position(index, first._window_start), date_position(index, first._window_stop))
+        AR = R[ev] - (alphas + betas * m[ev][:, None])
+        
+        results = []
+        for j, study in enumerate(group):
+            # Same minimum history as fetch_data
+            if valid[:, j].sum() < 50:
+                results.append(study._error_result('Failed to fetch data'))
+                continue
             
-            # Step 6: Outlier detection
-            is_outlier = self.filter_outliers()
+            study.alpha, study.beta = float(alphas[j]), float(betas[j])
+            ar_series = pd.Series(AR[:, j], index=index[ev]).dropna()
+            study.ar_series = ar_series
+            study.ar = study._event_day_ar(ar_series)
+            results.append(study._build_result())
+        
+        return results
+    
+    def _error_result(self, error: str) -> Dict:
+        """Result dict for an event that could not be analyzed"""
+        return {
+            'ticker': self.ticker,
+            'event_timestamp': self.event_timestamp.isoformat(),
+            'error': error,
+            'ar': 0.0,
+            'car': 0.0,
+            'confidence': 0.0,
+            'is_significant': False
+        }
+    
+    def _build_result(self) -> Dict:
+        """
+        Finish the analysis once alpha, beta and the AR series are set
+        
+        Returns:
+            Dict with all results (see run_full_analysis)
+        """
+        ar_series = self.ar_series
+        alpha, beta = self.alpha, self.beta
+        
+        if ar_series is None or len(ar_series) == 0:
+            return self._error_result('No data in event window')
+        
+        try:
+            # Steps 4-6: CAR, robust test statistic and outlier flag in one kernel
+            # (same results as calculate_car, statistical_test, filter_outliers)
+            ar_values = ar_series.to_numpy(dtype=np.float64)
+            car, t_stat, is_outlier = _ar_summary(ar_values, float(self.ar), 3.0)
+            car = float(car)
+            is_outlier = bool(is_outlier)
+            self.car = car
+            test_results = self._robust_test_result(t_stat, len(ar_values))
             
             # Build result
             result = {
                 'ticker': self.ticker,
                 'event_timestamp': self.event_timestamp.isoformat(),
-                'event_date': self.event_timestamp.date().isoformat(),
+                'event_date': self._event_date.isoformat(),
                 
                 # CAPM Parameters
                 'alpha': round(alpha, 6),
@@ -440,23 +670,15 @@ class EventStudy:
                 'direction': 'positive' if self.ar > 0 else 'negative' if self.ar < 0 else 'neutral',
                 
                 # Summary
-                'summary': self._generate_summary()
+                'summary': self._generate_summary(is_outlier)
             }
             
             return result
             
         except Exception as e:
-            return {
-                'ticker': self.ticker,
-                'event_timestamp': self.event_timestamp.isoformat(),
-                'error': f'Analysis failed: {str(e)}',
-                'ar': 0.0,
-                'car': 0.0,
-                'confidence': 0.0,
-                'is_significant': False
-            }
+            return self._error_result(f'Analysis failed: {str(e)}')
     
-    def _generate_summary(self) -> str:
+    def _generate_summary(self, is_outlier: Optional[bool] = None) -> str:
         """Generate human-readable summary of results"""
         if self.ar is None:
             return "Insufficient data for analysis"
@@ -471,7 +693,10 @@ class EventStudy:
         else:
             summary += "Not statistically significant. "
         
-        if self.filter_outliers():
+        if is_outlier is None:
+            is_outlier = self.filter_outliers()
+        
+        if is_outlier:
             summary += "⚠️ Flagged as potential outlier."
         
         return summary
@@ -498,6 +723,30 @@ def quick_event_study(ticker: str, event_timestamp: datetime, event_text: str =
     return results
 
 
+def batch_event_study(events: List[Tuple[str, datetime]], event_text: str = "") -> List[Dict]:
+    """
+    Convenience function for event studies over many (ticker, event_timestamp) pairs
+    
+    Price histories are downloaded together and cache misses fetched
+    concurrently, then events sharing a date get one stacked CAPM fit
+    (see EventStudy.batch).
+    
+    Args:
+        events: List of (ticker, event_timestamp) tuples
+        event_text: Optional text description shared by the events
+    
+    Returns:
+        List of result dicts, in input order
+    """
+    results = EventStudy.batch([(event_timestamp, ticker) for ticker, event_timestamp in events])
+    
+    if event_text:
+        for result in results:
+            result['event_text'] = event_text[:200]
+    
+    return results
+
+
 if __name__ == '__main__':
     # Example usage
     print("\n🧪 Testing Event Study Module\n")
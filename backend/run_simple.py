@@ -7,11 +7,12 @@ Handles setup and runs the server
 import os
 import sys
 import subprocess
+from typing import List
 
-def run_command(cmd, description):
-    """Run a command and show progress"""
+def run_command(argv: List[str], description):
+    """Run a command (argv list, no shell) and show progress"""
     print(f"\n[*] {description}...")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    result = subprocess.run(argv, capture_output=True, text=True)
     if result.returncode != 0:
         print(f"    ⚠️  Warning: {result.stderr.strip()}")
     else:
@@ -51,7 +52,10 @@ FLASK_ENV=development
         print(f"✓ Flask version: {flask.__version__}")
     except ImportError:
         print("\n[*] Installing Flask...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "flask", "flask-cors", "python-dotenv"])
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "-q",
+            "flask", "flask-cors", "python-dotenv"
+        ])
     
     # Initialize database
     print("\n[*] Initializing database...")
@@ -11,16 +11,35 @@ Background tasks:
 
 from datetime import datetime, timedelta
 from typing import List, Dict
+import gc
 
-from celery import Celery
+import msgpack
+import pandas as pd
+import redis
+import torch
+from celery import Celery, group
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from sqlalchemy import desc, func, insert, select, update
 
 from config import config
-from models.db import init_db, Event, Signal
+from models.db import init_db, insert_new_events, Event, Signal
 from nlp.pipeline import NLPPipeline
 from quant.event_study import quick_event_study
 from data.ingestion import aggregate_all_sources
 
+try:
+    import zstandard  # noqa: F401 (registers kombu's 'zstd' codec)
+    TASK_COMPRESSION = 'zstd'
+except ImportError:
+    TASK_COMPRESSION = 'gzip'
+
+try:
+    import resource  # POSIX only; peak RSS logging is skipped on Windows
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
 # Initialize Celery
 app = Celery(
     'political_alpha',
@@ -30,28 +49,109 @@ app = Celery(
 
 # Celery configuration
 app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    # msgpack: smaller, faster payloads (IDs and dicts of primitives);
+    # json still accepted for messages queued by older clients
+    task_serializer='msgpack',
+    accept_content=['msgpack', 'json'],
+    result_serializer='msgpack',
+    result_accept_content=['msgpack', 'json'],
+    task_compression=TASK_COMPRESSION,  # ~35% smaller bodies even for 32-ID chunks
     timezone='UTC',
     enable_utc=True,
     task_track_started=True,
     task_time_limit=300,  # 5 minutes max
-    worker_prefetch_multiplier=4,
-    worker_max_tasks_per_child=1000,
+    # Long NLP batches and short ingest ticks share workers; reserve few tasks
+    # per process so short ones don't queue behind a slow batch
+    worker_prefetch_multiplier=config.CELERY_PREFETCH_MULTIPLIER,
+    task_acks_late=True,  # Ack after completion so a lost worker's task is redelivered
+    task_reject_on_worker_lost=True,
+    worker_disable_rate_limits=True,  # No task sets rate_limit
+    worker_max_tasks_per_child=1000,  # Recycle children to bound slow leaks; peak RSS logged on exit
 )
 
-# Initialize database
+# Initialize database (prefork children run one task at a time: one pooled connection each)
 try:
-    engine, SessionLocal = init_db()
+    engine, SessionLocal = init_db(pool_size=1, max_overflow=0)
 except Exception as e:
     print(f"⚠️  Celery: Database init failed: {str(e)}")
+    engine = None
     SessionLocal = None
 
+
+# Result cache (same Redis as the broker); connects lazily on first command
+redis_client = redis.Redis.from_url(config.REDIS_URL)
+SUMMARY_CACHE_TTL_SECONDS = 48 * 3600
+EVENT_STUDY_CACHE_TTL_SECONDS = 24 * 3600
+
+
+def _cache_get(key: str):
+    """Read a msgpack value from the result cache (None on miss or Redis error)"""
+    try:
+        payload = redis_client.get(key)
+    except Exception as e:
+        print(f"⚠️  Cache read failed for {key}: {str(e)}")
+        return None
+    return msgpack.unpackb(payload) if payload is not None else None
+
+
+def _cache_set(key: str, value, ttl_seconds: int):
+    """Write a msgpack value to the result cache; failures are logged, not raised"""
+    try:
+        redis_client.set(key, msgpack.packb(value), ex=ttl_seconds)
+    except Exception as e:
+        print(f"⚠️  Cache write failed for {key}: {str(e)}")
+
+# Events per process_nlp_batch task (about one transformer batch)
+NLP_BATCH_CHUNK_SIZE = 32
+
+# Signals expired per cleanup transaction (keeps row locks short under concurrent inserts)
+CLEANUP_BATCH_SIZE = 10000
+
 # NLP pipeline singleton
 nlp_pipeline = None
 
 
+@worker_init.connect
+def _preload_nlp_pipeline(**kwargs):
+    """
+    Load the NLP models once in the parent, before the pool forks
+    
+    Children inherit the weights copy-on-write instead of each loading
+    its own copy. CUDA cannot be used across fork, so GPU hosts load
+    lazily per child instead.
+    """
+    global nlp_pipeline
+    if torch.cuda.is_available():
+        return
+    
+    nlp_pipeline = NLPPipeline()
+    
+    # Keep the loaded objects out of GC scans so children don't touch
+    # (and copy) their pages
+    gc.freeze()
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    """Per-child setup after fork"""
+    # Drop pooled connections inherited from the parent; each child opens its own
+    if engine is not None:
+        engine.dispose(close=False)
+    
+    # Children share the cores: one intra-op thread each avoids oversubscription
+    torch.set_num_threads(1)
+
+
+@worker_process_shutdown.connect
+def _log_worker_rss(pid=None, exitcode=None, **kwargs):
+    """Log peak RSS when a child exits (e.g. recycled after worker_max_tasks_per_child)"""
+    if not RESOURCE_AVAILABLE:
+        return
+    
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"📦 Celery worker {pid} exiting (code {exitcode}), peak RSS {peak_mb:.0f} MB")
+
+
 def get_nlp_pipeline():
     """Lazy-load NLP pipeline"""
     global nlp_pipeline
@@ -74,55 +174,70 @@ def process_nlp_batch(event_ids: List[int]):
     if not SessionLocal:
         return {'error': 'Database not available'}
     
-    session = SessionLocal()
     pipeline = get_nlp_pipeline()
     
-    processed_count = 0
-    signal_count = 0
+    processed_ids = []
+    signal_rows = []
     
     try:
-        events = session.query(Event).filter(Event.id.in_(event_ids)).all()
+        # Read unprocessed events; no transaction is held during NLP inference
+        with SessionLocal() as session:
+            events = session.query(Event.id, Event.text, Event.event_timestamp)\
+                .filter(Event.id.in_(event_ids))\
+                .filter(Event.processed_at.is_(None))\
+                .all()
         
-        for event in events:
-            # Skip if already processed
-            if event.processed_at:
-                continue
-            
-            # Process through NLP
-            nlp_result = pipeline.process_text(event.text, event.event_timestamp.isoformat())
-            
-            # Create signals
+        # Process through NLP in one batch (batched transformer/spaCy/keyword stages);
+        # timestamps are only echoed back, so pass the datetimes unformatted
+        nlp_results = pipeline.process_batch(
+            [text for _, text, _ in events],
+            [event_timestamp for _, _, event_timestamp in events]
+        )
+        
+        for (event_id, _, _), nlp_result in zip(events, nlp_results):
+            # Collect signal rows for one bulk insert
             for sig in nlp_result['signals']:
-                signal = Signal(
-                    event_id=event.id,
-                    ticker=sig['ticker'],
-                    signal_type=sig['type'],
-                    direction=sig['direction'],
-                    confidence=sig['confidence'],
-                    sentiment_polarity=nlp_result['sentiment_polarity'],
-                    tone=nlp_result['tone'],
-                    explanation=sig['reason']
-                )
-                session.add(signal)
-                signal_count += 1
+                signal_rows.append({
+                    'event_id': event_id,
+                    'ticker': sig['ticker'],
+                    'signal_type': sig['type'],
+                    'direction': sig['direction'],
+                    'confidence': sig['confidence'],
+                    'sentiment_polarity': nlp_result['sentiment_polarity'],
+                    'tone': nlp_result['tone'],
+                    'explanation': sig['reason']
+                })
             
-            # Mark as processed
-            event.processed_at = datetime.utcnow()
-            processed_count += 1
+            processed_ids.append(event_id)
         
-        session.commit()
+        # One short write transaction (commits on exit, rolls back on error)
+        signal_ids = []
+        with SessionLocal.begin() as session:
+            # Single executemany INSERT instead of per-object session.add
+            if signal_rows:
+                signal_ids = session.scalars(insert(Signal).returning(Signal.id), signal_rows).all()
+            
+            # Mark the whole batch processed with one UPDATE ... WHERE id IN (...)
+            if processed_ids:
+                session.query(Event)\
+                    .filter(Event.id.in_(processed_ids))\
+                    .update({'processed_at': datetime.utcnow()}, synchronize_session=False)
+        
+        # Fan out event studies for the new signals across workers
+        event_study_group_id = None
+        if signal_ids:
+            event_study_group = group(compute_event_study.s(signal_id) for signal_id in signal_ids).apply_async()
+            event_study_group_id = event_study_group.id
         
         return {
             'status': 'success',
-            'processed_events': processed_count,
-            'generated_signals': signal_count
+            'processed_events': len(processed_ids),
+            'generated_signals': len(signal_rows),
+            'event_study_group_id': event_study_group_id
         }
         
     except Exception as e:
-        session.rollback()
         return {'error': str(e)}
-    finally:
-        session.close()
 
 
 @app.task(name='tasks.compute_event_study')
@@ -139,48 +254,55 @@ def compute_event_study(signal_id: int):
     if not SessionLocal:
         return {'error': 'Database not available'}
     
-    session = SessionLocal()
+    cache_key = f"es:{signal_id}"
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        # Signal row was already updated when this result was cached
+        return cached
     
     try:
-        signal = session.query(Signal).filter(Signal.id == signal_id).first()
+        with SessionLocal() as session:
+            row = session.query(Signal.ticker, Event.event_timestamp, Event.text)\
+                .join(Signal.event)\
+                .filter(Signal.id == signal_id)\
+                .first()
         
-        if not signal:
+        if not row:
             return {'error': f'Signal {signal_id} not found'}
         
-        event = signal.event
+        ticker, event_timestamp, text = row
         
-        # Run event study
-        event_study_result = quick_event_study(
-            signal.ticker,
-            event.event_timestamp,
-            event.text
-        )
+        # Run event study (market data fetch) outside any transaction
+        event_study_result = quick_event_study(ticker, event_timestamp, text)
         
         if 'error' not in event_study_result:
             # Update signal with event study results
-            signal.abnormal_return = event_study_result.get('ar')
-            signal.car = event_study_result.get('car')
-            signal.p_value = event_study_result.get('p_value')
-            signal.is_significant = event_study_result.get('is_significant', False)
-            signal.beta = event_study_result.get('beta')
-            signal.is_outlier = event_study_result.get('is_outlier', False)
+            with SessionLocal.begin() as session:
+                session.query(Signal)\
+                    .filter(Signal.id == signal_id)\
+                    .update({
+                        'abnormal_return': event_study_result.get('ar'),
+                        'car': event_study_result.get('car'),
+                        'p_value': event_study_result.get('p_value'),
+                        'is_significant': event_study_result.get('is_significant', False),
+                        'beta': event_study_result.get('beta'),
+                        'is_outlier': event_study_result.get('is_outlier', False)
+                    }, synchronize_session=False)
             
-            session.commit()
-            
-            return {
+            result = {
                 'status': 'success',
                 'signal_id': signal_id,
                 'ar': event_study_result.get('ar'),
                 'is_significant': event_study_result.get('is_significant')
             }
+            _cache_set(cache_key, result, EVENT_STUDY_CACHE_TTL_SECONDS)
+            
+            return result
         else:
             return {'error': event_study_result['error']}
         
     except Exception as e:
-        session.rollback()
         return {'error': str(e)}
-    finally:
-        session.close()
 
 
 @app.task(name='tasks.ingest_realtime_data')
@@ -205,53 +327,43 @@ def ingest_realtime_data():
         if data.empty:
             return {'status': 'success', 'new_events': 0}
         
-        session = SessionLocal()
-        new_event_count = 0
+        # Fallback IDs only for rows without a source ID; timestamps are
+        # string-formatted just for those rows
+        if 'id' in data.columns:
+            external_ids = data['id'].copy()
+            missing = external_ids.isna()
+            if missing.any():
+                external_ids[missing] = 'auto_' + data.loc[missing, 'timestamp'].astype(str)
+        else:
+            external_ids = 'auto_' + data['timestamp'].astype(str)
         
-        for _, row in data.iterrows():
-            # Check if already exists
-            existing = session.query(Event).filter(
-                Event.external_id == row.get('id', f"auto_{row['timestamp']}")
-            ).first()
-            
-            if existing:
-                continue
-            
-            # Create new event
-            event = Event(
-                external_id=row.get('id', f"auto_{row['timestamp']}"),
-                text=row['text'],
-                source=row['source'],
-                author=row.get('author', 'unknown'),
-                event_timestamp=row['timestamp']
-            )
-            session.add(event)
-            new_event_count += 1
+        # Build Event rows column-wise; one row per external ID (first occurrence wins)
+        batch = pd.DataFrame({
+            'external_id': external_ids,
+            'text': data['text'],
+            'source': data['source'],
+            'author': data['author'] if 'author' in data.columns else 'unknown',
+            'event_timestamp': data['timestamp']
+        }).drop_duplicates('external_id')
         
-        session.commit()
-        session.close()
+        # Single INSERT ... ON CONFLICT DO NOTHING, returning only the new IDs
+        with SessionLocal.begin() as session:
+            event_ids = insert_new_events(session, batch.to_dict('records'))
         
-        # Trigger NLP processing for new events
-        if new_event_count > 0:
-            # Get IDs of new events
-            session = SessionLocal()
-            recent_unprocessed = session.query(Event)\
-                .filter(Event.processed_at.is_(None))\
-                .order_by(Event.ingested_at.desc())\
-                .limit(new_event_count)\
-                .all()
-            
-            event_ids = [e.id for e in recent_unprocessed]
-            session.close()
-            
-            # Queue for processing
-            if event_ids:
-                process_nlp_batch.delay(event_ids)
+        new_event_count = len(event_ids)
+        
+        # Queue new events for NLP processing, chunked so idle workers share a burst
+        if event_ids:
+            chunks = [
+                event_ids[i:i + NLP_BATCH_CHUNK_SIZE]
+                for i in range(0, len(event_ids), NLP_BATCH_CHUNK_SIZE)
+            ]
+            group(process_nlp_batch.s(chunk) for chunk in chunks).apply_async()
         
         return {
             'status': 'success',
             'new_events': new_event_count,
-            'queued_for_processing': new_event_count
+            'queued_for_processing': len(event_ids)
         }
         
     except Exception as e:
@@ -269,18 +381,28 @@ def cleanup_expired_signals():
     if not SessionLocal:
         return {'error': 'Database not available'}
     
-    session = SessionLocal()
-    
     try:
         cutoff = datetime.utcnow() - timedelta(days=3)
         
-        expired_count = session.query(Signal)\
-            .filter(Signal.generated_at < cutoff)\
-            .filter(Signal.status == 'active')\
-            .update({'status': 'expired'})
+        # Expire in bounded batches, one short transaction each, so a backlog of
+        # days doesn't hold locks that block signal INSERTs from NLP tasks
+        batch_ids = select(Signal.id)\
+            .where(Signal.generated_at < cutoff)\
+            .where(Signal.status == 'active')\
+            .limit(CLEANUP_BATCH_SIZE)\
+            .scalar_subquery()
+        expire_batch = update(Signal)\
+            .where(Signal.id.in_(batch_ids))\
+            .values(status='expired')\
+            .execution_options(synchronize_session=False)
         
-        session.commit()
-        session.close()
+        expired_count = 0
+        while True:
+            with SessionLocal.begin() as session:
+                updated = session.execute(expire_batch).rowcount
+            expired_count += updated
+            if updated < CLEANUP_BATCH_SIZE:
+                break
         
         return {
             'status': 'success',
@@ -288,8 +410,6 @@ def cleanup_expired_signals():
         }
         
     except Exception as e:
-        session.rollback()
-        session.close()
         return {'error': str(e)}
 
 
@@ -303,38 +423,33 @@ def generate_daily_summary():
     if not SessionLocal:
         return {'error': 'Database not available'}
     
-    session = SessionLocal()
-    
     try:
         yesterday = datetime.utcnow() - timedelta(days=1)
         
-        # Count events and signals
-        events_count = session.query(Event)\
-            .filter(Event.event_timestamp >= yesterday)\
-            .count()
-        
-        signals_count = session.query(Signal)\
-            .filter(Signal.generated_at >= yesterday)\
-            .count()
-        
-        # Average confidence
-        from sqlalchemy import func
-        avg_confidence = session.query(func.avg(Signal.confidence))\
-            .filter(Signal.generated_at >= yesterday)\
-            .scalar()
-        
-        # Top tickers
-        from sqlalchemy import func, desc
-        top_tickers = session.query(
-            Signal.ticker,
-            func.count(Signal.id).label('count')
-        ).filter(Signal.generated_at >= yesterday)\
-         .group_by(Signal.ticker)\
-         .order_by(desc('count'))\
-         .limit(5)\
-         .all()
-        
-        session.close()
+        # Core selects: plain SELECT count(*)/avg(...) rows, no ORM entity loading
+        with SessionLocal() as session:
+            # Event count, signal count and average confidence in one round trip
+            events_count_subquery = select(func.count())\
+                .select_from(Event)\
+                .where(Event.event_timestamp >= yesterday)\
+                .scalar_subquery()
+            
+            events_count, signals_count, avg_confidence = session.execute(
+                select(
+                    events_count_subquery,
+                    func.count(Signal.id),
+                    func.avg(Signal.confidence)
+                ).where(Signal.generated_at >= yesterday)
+            ).one()
+            
+            # Top tickers
+            top_tickers = session.execute(
+                select(Signal.ticker, func.count(Signal.id).label('count'))
+                .where(Signal.generated_at >= yesterday)
+                .group_by(Signal.ticker)
+                .order_by(desc('count'))
+                .limit(5)
+            ).all()
         
         summary = {
             'date': yesterday.date().isoformat(),
@@ -344,6 +459,9 @@ def generate_daily_summary():
             'top_tickers': [{'ticker': t, 'count': c} for t, c in top_tickers]
         }
         
+        # Keep the summary in Redis so readers don't need to hit Postgres
+        _cache_set(f"summary:{summary['date']}", summary, SUMMARY_CACHE_TTL_SECONDS)
+        
         return {
             'status': 'success',
             'summary': summary
@@ -0,0 +1,130 @@
+"""
+Shared Test Fixtures
+====================
+
+Heavy NLP components (transformer, spaCy and lexicon models) are built once
+per test session and shared by every test that only reads from them. The
+test database schema is likewise created once; each test runs inside a
+transaction that is rolled back afterwards. API tests share one warmed
+Flask test client. Imports happen inside the fixtures so suites that never request them
+(data, quant) don't pull in the NLP, database or app stack.
+"""
+
+import os
+
+import pytest
+
+# Reuse exported ONNX models across runs and checkouts; the default is
+# relative to the working directory, so each cwd would re-export. Set
+# before config is first imported. (Hub downloads already land in
+# ~/.cache/huggingface.)
+os.environ.setdefault('ONNX_MODEL_DIR', os.path.expanduser('~/.cache/trumpplan/onnx_models'))
+
+
+@pytest.fixture(scope='session')
+def sentiment_analyzer():
+    """Session-wide SentimentAnalyzer"""
+    from nlp.pipeline import SentimentAnalyzer
+    return SentimentAnalyzer()
+
+
+@pytest.fixture(scope='session')
+def lexicon_sentiment_analyzer():
+    """
+    Session-wide SentimentAnalyzer on the VADER backend (no transformer load)
+    
+    For tests of the keyword/tone rules, which never touch the model.
+    """
+    from nlp.pipeline import SentimentAnalyzer
+    return SentimentAnalyzer(backend='vader')
+
+
+@pytest.fixture(scope='session')
+def entity_extractor():
+    """Session-wide EntityExtractor"""
+    from nlp.pipeline import EntityExtractor
+    return EntityExtractor()
+
+
+@pytest.fixture(scope='session')
+def topic_modeler():
+    """Session-wide (unfitted) TopicModeler"""
+    from nlp.pipeline import TopicModeler
+    return TopicModeler()
+
+
+@pytest.fixture(scope='session')
+def nlp_pipeline():
+    """Session-wide NLPPipeline"""
+    from nlp.pipeline import NLPPipeline
+    return NLPPipeline()
+
+
+@pytest.fixture(scope='session')
+def sentiment_explainer():
+    """Session-wide SentimentExplainer"""
+    from nlp.explainability import SentimentExplainer
+    return SentimentExplainer()
+
+
+@pytest.fixture(scope='session')
+def db_engine():
+    """In-memory SQLite engine and session factory, schema created once"""
+    from sqlalchemy import event
+    from models.db import init_db
+    
+    engine, SessionLocal = init_db('sqlite:///:memory:')
+    
+    # pysqlite defers BEGIN itself and commits around SAVEPOINT, which would
+    # leak test writes; let SQLAlchemy emit BEGIN so rollback covers them
+    @event.listens_for(engine, 'connect')
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+    
+    # The in-memory database lives on the connection create_all already opened
+    with engine.connect() as connection:
+        connection.connection.dbapi_connection.isolation_level = None
+    
+    return engine, SessionLocal
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """
+    Session joined to an outer transaction that is rolled back after the test
+    
+    The test's own commit() calls only release SAVEPOINTs, so nothing it
+    writes is visible to the next test.
+    """
+    engine, SessionLocal = db_engine
+    connection = engine.connect()
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection, join_transaction_mode='create_savepoint')
+    
+    yield session
+    
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope='session')
+def client(nlp_pipeline):
+    """
+    Session-wide Flask test client (the API is stateless: no cookies or sessions)
+    
+    The app's lazily loaded pipeline is seeded with the session pipeline, so
+    no API test pays the model load inside a request and the models are
+    loaded once for unit and API tests alike.
+    """
+    import app.main
+    
+    if app.main.nlp_pipeline is None:
+        app.main.nlp_pipeline = nlp_pipeline
+    
+    app.main.app.config['TESTING'] = True
+    return app.main.app.test_client()
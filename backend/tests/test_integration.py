@@ -13,9 +13,7 @@ import pytest
 from datetime import datetime
 import time
 
-from app.main import app as flask_app
-from models.db import init_db, Event, Signal, User
-from nlp.pipeline import NLPPipeline
+from models.db import Event, Signal, User
 from quant.event_study import quick_event_study
 from data.ingestion import TrumpDataIngestion
 
@@ -23,23 +21,7 @@ from data.ingestion import TrumpDataIngestion
 class TestEndToEndPipeline:
     """Test complete data flow from ingestion to API"""
     
-    @pytest.fixture
-    def app(self):
-        """Flask test client"""
-        flask_app.config['TESTING'] = True
-        with flask_app.test_client() as client:
-            yield client
-    
-    @pytest.fixture
-    def db_session(self):
-        """Test database session"""
-        # Use in-memory SQLite for testing
-        engine, SessionLocal = init_db('sqlite:///:memory:')
-        session = SessionLocal()
-        yield session
-        session.close()
-    
-    def test_full_signal_generation_pipeline(self, app):
+    def test_full_signal_generation_pipeline(self, client):
         """
         Test: Political text → NLP → Event Study → API response
         
@@ -56,12 +38,8 @@ class TestEndToEndPipeline:
             'run_event_study': False  # Skip for speed in test
         }
         
-        start_time = time.time()
-        
         # Call API
-        response = app.post('/api/signal', json=payload)
-        
-        elapsed = time.time() - start_time
+        response = client.post('/api/signal', json=payload)
         
         # Assertions
         assert response.status_code == 200
@@ -77,13 +55,8 @@ class TestEndToEndPipeline:
         assert 'ticker' in signal
         assert 'direction' in signal
         assert 'confidence' in signal
-        
-        # Performance check
-        assert elapsed < 5.0, f"Pipeline took {elapsed:.2f}s (target: <5s)"
-        
-        print(f"✓ End-to-end pipeline: {elapsed:.2f}s")
     
-    def test_nlp_to_database_flow(self, db_session):
+    def test_nlp_to_database_flow(self, db_session, nlp_pipeline):
         """
         Test: NLP processing → Database storage
         
@@ -102,11 +75,10 @@ class TestEndToEndPipeline:
             event_timestamp=datetime(2024, 1, 15, 10, 0, 0)
         )
         db_session.add(event)
-        db_session.commit()
+        db_session.flush()  # Assigns event.id; no commit needed
         
         # Process through NLP
-        pipeline = NLPPipeline()
-        nlp_result = pipeline.process_text(event.text)
+        nlp_result = nlp_pipeline.process_text(event.text)
         
         # Store signals
         for sig in nlp_result['signals']:
@@ -121,7 +93,7 @@ class TestEndToEndPipeline:
             )
             db_session.add(signal)
         
-        db_session.commit()
+        db_session.flush()
         
         # Query back
         stored_signals = db_session.query(Signal).filter(Signal.event_id == event.id).all()
@@ -131,9 +103,9 @@ class TestEndToEndPipeline:
         
         print(f"✓ NLP → Database: {len(stored_signals)} signals stored")
     
-    def test_api_health_check(self, app):
+    def test_api_health_check(self, client):
         """Test health check endpoint"""
-        response = app.get('/health')
+        response = client.get('/health')
         
         assert response.status_code in [200, 503]  # 503 if DB not configured
         
@@ -141,9 +113,9 @@ class TestEndToEndPipeline:
         assert 'status' in data
         assert 'timestamp' in data
     
-    def test_api_list_signals(self, app):
+    def test_api_list_signals(self, client):
         """Test listing signals endpoint"""
-        response = app.get('/api/signals?limit=5')
+        response = client.get('/api/signals?limit=5')
         
         # Should not crash even if DB is empty
         assert response.status_code in [200, 503]
@@ -157,19 +129,13 @@ class TestEndToEndPipeline:
 class TestWaitlistFlow:
     """Test waitlist signup and referral system"""
     
-    @pytest.fixture
-    def app(self):
-        flask_app.config['TESTING'] = True
-        with flask_app.test_client() as client:
-            yield client
-    
-    def test_waitlist_signup_api(self, app):
+    def test_waitlist_signup_api(self, client):
         """Test waitlist signup via API"""
         payload = {
             'email': f'test_{int(time.time())}@example.com'
         }
         
-        response = app.post('/waitlist', json=payload)
+        response = client.post('/waitlist', json=payload)
         
         # Should work or return service unavailable
         assert response.status_code in [200, 201, 503]
@@ -180,56 +146,57 @@ class TestWaitlistFlow:
             assert 'referral_code' in data
 
 
+def _assert_mean_below(benchmark, seconds: float):
+    """Check the benchmark's mean round time (skipped under --benchmark-disable)"""
+    if benchmark.stats is not None:
+        mean = benchmark.stats.stats.mean
+        assert mean < seconds, f"Mean {mean:.3f}s (target: <{seconds:g}s)"
+
+
+@pytest.mark.slow
 class TestPerformance:
-    """Performance and load tests"""
+    """Performance tests (deselected by default; run with: pytest -m slow)"""
     
-    def test_nlp_processing_speed(self):
+    @pytest.mark.parametrize('text', [
+        'Boeing announces new aircraft delays.',
+        'Apple reports strong iPhone sales in China.',
+        'Tesla stock surges on delivery numbers.'
+    ])
+    def test_nlp_processing_speed(self, benchmark, nlp_pipeline, text):
         """Test NLP processing latency"""
-        pipeline = NLPPipeline()
-        
-        test_texts = [
-            'Boeing announces new aircraft delays.',
-            'Apple reports strong iPhone sales in China.',
-            'Tesla stock surges on delivery numbers.'
-        ]
-        
-        times = []
-        for text in test_texts:
-            start = time.time()
-            result = pipeline.process_text(text)
-            elapsed = time.time() - start
-            times.append(elapsed)
-            
-            assert result is not None
-            assert 'signals' in result
-        
-        avg_time = sum(times) / len(times)
-        assert avg_time < 2.0, f"NLP avg time: {avg_time:.2f}s (target: <2s)"
-        
-        print(f"✓ NLP processing: {avg_time:.3f}s avg")
+        result = benchmark(nlp_pipeline.process_text, text)
+        
+        assert result is not None
+        assert 'signals' in result
+        _assert_mean_below(benchmark, 2.0)
+    
+    def test_signal_api_latency(self, benchmark, client):
+        """Test end-to-end /api/signal latency (NLP only, no event study)"""
+        payload = {
+            'text': 'Boeing is doing terrible work on the new aircraft. Cancel the order!',
+            'timestamp': '2024-01-15T10:30:00Z',
+            'run_event_study': False
+        }
+        
+        response = benchmark(client.post, '/api/signal', json=payload)
+        
+        assert response.status_code == 200
+        _assert_mean_below(benchmark, 5.0)
     
-    def test_api_response_time(self, ):
+    def test_api_response_time(self, benchmark, client):
         """Test API response time"""
-        flask_app.config['TESTING'] = True
-        with flask_app.test_client() as client:
-            start = time.time()
-            response = client.get('/health')
-            elapsed = time.time() - start
-            
-            assert response.status_code in [200, 503]
-            assert elapsed < 1.0, f"API response: {elapsed:.3f}s (target: <1s)"
-            
-            print(f"✓ API response time: {elapsed:.3f}s")
+        response = benchmark(client.get, '/health')
+        
+        assert response.status_code in [200, 503]
+        _assert_mean_below(benchmark, 1.0)
 
 
 class TestDataIntegrity:
     """Test data validation and integrity"""
     
-    def test_duplicate_event_handling(self, ):
+    def test_duplicate_event_handling(self, db_session):
         """Test that duplicate events are handled"""
-        # Use in-memory DB
-        engine, SessionLocal = init_db('sqlite:///:memory:')
-        session = SessionLocal()
+        session = db_session
         
         # Create event
         event1 = Event(
@@ -240,7 +207,7 @@ class TestDataIntegrity:
             event_timestamp=datetime.utcnow()
         )
         session.add(event1)
-        session.commit()
+        session.flush()
         
         # Try to create duplicate
         event2 = Event(
@@ -255,8 +222,6 @@ class TestDataIntegrity:
         # Should raise integrity error
         with pytest.raises(Exception):
             session.commit()
-        
-        session.close()
     
     def test_signal_validation(self, ):
         """Test signal data validation"""
@@ -281,58 +246,50 @@ class TestDataIntegrity:
 class TestErrorHandling:
     """Test error handling and edge cases"""
     
-    def test_invalid_api_request(self):
+    def test_invalid_api_request(self, client):
         """Test API with invalid request"""
-        flask_app.config['TESTING'] = True
-        with flask_app.test_client() as client:
-            # Missing required field
-            response = client.post('/api/signal', json={})
-            
-            assert response.status_code == 400
-            data = response.get_json()
-            assert 'error' in data
+        # Missing required field
+        response = client.post('/api/signal', json={})
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'error' in data
     
-    def test_empty_text_handling(self):
+    def test_empty_text_handling(self, nlp_pipeline):
         """Test NLP with empty text"""
-        pipeline = NLPPipeline()
-        
         # Should not crash
-        result = pipeline.process_text('')
+        result = nlp_pipeline.process_text('')
         
         assert result is not None
         assert 'signals' in result
     
-    def test_malformed_date_handling(self):
+    def test_malformed_date_handling(self, client):
         """Test handling of malformed dates"""
-        flask_app.config['TESTING'] = True
-        with flask_app.test_client() as client:
-            payload = {
-                'text': 'Test text',
-                'timestamp': 'not-a-date'
-            }
-            
-            # Should handle gracefully
-            response = client.post('/api/signal', json=payload)
-            
-            # May succeed with current time or return error
-            assert response.status_code in [200, 400, 500]
+        payload = {
+            'text': 'Test text',
+            'timestamp': 'not-a-date'
+        }
+        
+        # Should handle gracefully
+        response = client.post('/api/signal', json=payload)
+        
+        # May succeed with current time or return error
+        assert response.status_code in [200, 400, 500]
 
 
 class TestSecurityCompliance:
     """Test security and compliance features"""
     
-    def test_disclaimer_present_in_response(self):
+    def test_disclaimer_present_in_response(self, client):
         """Test that disclaimer is included in API responses"""
-        flask_app.config['TESTING'] = True
-        with flask_app.test_client() as client:
-            response = client.post('/api/signal', json={
-                'text': 'Test political text about Boeing'
-            })
-            
-            if response.status_code == 200:
-                data = response.get_json()
-                assert 'disclaimer' in data
-                assert 'NOT' in data['disclaimer'] or 'not' in data['disclaimer']
+        response = client.post('/api/signal', json={
+            'text': 'Test political text about Boeing'
+        })
+        
+        if response.status_code == 200:
+            data = response.get_json()
+            assert 'disclaimer' in data
+            assert 'NOT' in data['disclaimer'] or 'not' in data['disclaimer']
     
     def test_no_sensitive_data_in_logs(self):
         """Test that sensitive data is not logged"""
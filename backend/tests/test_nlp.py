@@ -18,6 +18,7 @@ from nlp.pipeline import (
     NLPPipeline,
     batch_process_texts
 )
+from nlp.keywords import KeywordMatcher
 from nlp.explainability import (
     SentimentExplainer,
     SignalExplainer,
@@ -25,6 +26,25 @@ from nlp.explainability import (
 )
 
 
+# (text, expected polarity sign, expected stock signal direction)
+SIGNAL_CASES = [
+    ("Apple is doing fantastic work! Best company ever!", 1, 'long'),
+    ("Boeing is a disaster! Worst company! Cancel everything!", -1, 'short'),
+]
+
+
+@pytest.fixture(scope='module')
+def signal_case_results(nlp_pipeline):
+    """SIGNAL_CASES run through the pipeline in one batch"""
+    return batch_process_texts([text for text, _, _ in SIGNAL_CASES], nlp_pipeline=nlp_pipeline)
+
+
+@pytest.fixture(scope='module')
+def long_text_result(nlp_pipeline):
+    """Pipeline output for a very long text (the costliest single input), computed once"""
+    return nlp_pipeline.process_text("Apple is great. " * 1000)
+
+
 class TestSentimentAnalyzer:
     """Test sentiment analysis"""
     
@@ -33,52 +53,104 @@ class TestSentimentAnalyzer:
         analyzer = SentimentAnalyzer()
         assert analyzer is not None
     
-    def test_analyze_positive_sentiment(self):
-        """Test positive sentiment detection"""
-        analyzer = SentimentAnalyzer()
-        text = "This is wonderful news! Apple is doing great things."
-        
-        result = analyzer.analyze_sentiment(text)
+    def test_vader_backend_skips_transformer(self, lexicon_sentiment_analyzer):
+        """Test the lexicon backend scores text without loading a model"""
+        assert lexicon_sentiment_analyzer.model_loaded is False
+        assert lexicon_sentiment_analyzer.sentiment_pipeline is None
+        assert lexicon_sentiment_analyzer.analyze_sentiment("This is wonderful news!")['polarity'] > 0
+    
+    @pytest.mark.parametrize('text,expected_sign', [
+        pytest.param("This is wonderful news! Apple is doing great things.", 1, id='positive'),
+        pytest.param("This is terrible! The worst disaster ever!", -1, id='negative'),
+    ])
+    def test_analyze_sentiment(self, sentiment_analyzer, text, expected_sign):
+        """Test sentiment polarity detection"""
+        result = sentiment_analyzer.analyze_sentiment(text)
         
         assert 'label' in result
         assert 'polarity' in result
-        assert result['polarity'] > 0  # Should be positive
+        assert result['polarity'] * expected_sign > 0
     
-    def test_analyze_negative_sentiment(self):
-        """Test negative sentiment detection"""
-        analyzer = SentimentAnalyzer()
-        text = "This is terrible! The worst disaster ever!"
-        
-        result = analyzer.analyze_sentiment(text)
+    def test_batch_analyze_preserves_order(self, sentiment_analyzer):
+        """Test batched sentiment returns results in input order"""
+        texts = [
+            "This is terrible! The worst disaster ever!",
+            "Wonderful",
+            "This is wonderful news! Apple is doing great things."
+        ]
         
-        assert result['polarity'] < 0  # Should be negative
+        results = sentiment_analyzer.batch_analyze(texts)
+        
+        assert len(results) == 3
+        assert results[0]['polarity'] < 0
+        assert results[1]['polarity'] > 0
+        assert results[2]['polarity'] > 0
+        assert sentiment_analyzer.batch_analyze([]) == []
+    
+    @pytest.mark.parametrize('text,expected', [
+        pytest.param("Cancel the order! This is a disaster! Fire everyone!", 'Aggressive', id='aggressive'),
+        pytest.param("Great working together! Wonderful partnership! Thank you!", 'Cooperative', id='cooperative'),
+        pytest.param("The meeting occurred at 3pm. Data was discussed.", 'Neutral', id='neutral'),
+    ])
+    def test_classify_tone(self, lexicon_sentiment_analyzer, text, expected):
+        """Test keyword tone classification"""
+        assert lexicon_sentiment_analyzer.classify_tone(text) == expected
+    
+    def test_keyword_sentiment_margin(self):
+        """Test keyword heuristic only fires on a decisive tone margin"""
+        assert SentimentAnalyzer.keyword_sentiment(1, 0) is None
+        assert SentimentAnalyzer.keyword_sentiment(3, 1) is None
+        
+        negative = SentimentAnalyzer.keyword_sentiment(4, 0)
+        positive = SentimentAnalyzer.keyword_sentiment(0, 6)
+        
+        assert negative['label'] == 'negative'
+        assert negative['polarity'] == -0.8
+        assert positive['polarity'] == 0.9
+
+
+class TestKeywordMatcher:
+    """Test multi-keyword matching"""
     
-    def test_classify_tone_aggressive(self):
-        """Test aggressive tone classification"""
-        analyzer = SentimentAnalyzer()
-        text = "Cancel the order! This is a disaster! Fire everyone!"
+    def test_find_distinct_substrings(self):
+        """Test keywords are matched as substrings and counted once"""
+        matcher = KeywordMatcher({'fail': 'neg', 'failing': 'neg', 'great': 'pos'})
         
-        tone = analyzer.classify_tone(text)
+        found = matcher.find("failing, failing, great")
         
-        assert tone == 'Aggressive'
+        assert found == ['fail', 'failing', 'great']
+        assert matcher.count_labels("failing, failing, great") == {'neg': 2, 'pos': 1}
     
-    def test_classify_tone_cooperative(self):
-        """Test cooperative tone classification"""
-        analyzer = SentimentAnalyzer()
-        text = "Great working together! Wonderful partnership! Thank you!"
+    def test_no_matches(self):
+        """Test text without keywords"""
+        matcher = KeywordMatcher({'tariff': 'trade'})
         
-        tone = analyzer.classify_tone(text)
+        assert matcher.find("nothing relevant here") == []
+        assert matcher.count_labels("nothing relevant here")['trade'] == 0
+    
+    def test_combined_scan_feeds_each_matcher(self):
+        """Test one combined scan gives the same counts as separate scans"""
+        tone = KeywordMatcher({'great': 'pos', 'disaster': 'neg'})
+        topic = KeywordMatcher({'tariff': 'trade', 'oil': 'energy'})
+        combined = KeywordMatcher.combine(tone, topic)
+        text = "great tariff deal, oil disaster"
         
-        assert tone == 'Cooperative'
+        found = combined.find(text)
+        
+        assert tone.count_found(found) == tone.count_labels(text)
+        assert topic.count_found(found) == topic.count_labels(text)
     
-    def test_classify_tone_neutral(self):
-        """Test neutral tone classification"""
-        analyzer = SentimentAnalyzer()
-        text = "The meeting occurred at 3pm. Data was discussed."
+    def test_regex_fallback_matches_substring_scan(self, monkeypatch):
+        """Test the large-keyword-set regex path finds the same keywords as `in`"""
+        import nlp.keywords as keywords_module
+        monkeypatch.setattr(keywords_module, 'AHOCORASICK_AVAILABLE', False)
         
-        tone = analyzer.classify_tone(text)
+        words = [f"{a}{b}" for a in 'abcdefghijklm' for b in 'nopqrstuvwxyz'] + ['a', 'abn', 'tariff']
+        matcher = KeywordMatcher({word: 'label' for word in words})
+        text = "an abn tariff zz mo"
         
-        assert tone == 'Neutral'
+        assert matcher._regex is not None
+        assert matcher.find(text) == [word for word in words if word in text]
 
 
 class TestEntityExtractor:
@@ -89,36 +161,45 @@ class TestEntityExtractor:
         extractor = EntityExtractor()
         assert extractor is not None
     
-    def test_extract_entities_with_ticker(self):
+    def test_extract_entities_with_ticker(self, entity_extractor):
         """Test entity extraction with company mentions"""
-        extractor = EntityExtractor()
         text = "Boeing is building a new aircraft for the government."
         
-        result = extractor.extract_entities(text)
+        result = entity_extractor.extract_entities(text)
         
         assert 'organizations' in result
         assert 'tickers' in result
         assert 'BA' in result['tickers'] or 'Boeing' in text.lower()
     
-    def test_extract_multiple_companies(self):
+    def test_extract_multiple_companies(self, entity_extractor):
         """Test multiple company extraction"""
-        extractor = EntityExtractor()
         text = "Apple and Microsoft are working together on this project."
         
-        result = extractor.extract_entities(text)
+        result = entity_extractor.extract_entities(text)
         
         # Should find at least one ticker
         assert len(result['tickers']) >= 1
     
-    def test_extract_no_entities(self):
+    def test_extract_no_entities(self, entity_extractor):
         """Test text with no entities"""
-        extractor = EntityExtractor()
         text = "This is a generic statement with no companies."
         
-        result = extractor.extract_entities(text)
+        result = entity_extractor.extract_entities(text)
         
         assert isinstance(result['tickers'], list)
         assert isinstance(result['organizations'], list)
+    
+    def test_extract_entities_batch(self, entity_extractor):
+        """Test batched extraction returns one result per text"""
+        texts = [
+            "Boeing is building a new aircraft for the government.",
+            "This is a generic statement with no companies."
+        ]
+        
+        results = entity_extractor.extract_entities_batch(texts)
+        
+        assert len(results) == 2
+        assert results == [entity_extractor.extract_entities(text) for text in texts]
 
 
 class TestTopicModeler:
@@ -129,47 +210,72 @@ class TestTopicModeler:
         modeler = TopicModeler()
         assert modeler.n_topics == 10
     
-    def test_classify_trade_topic(self):
-        """Test trade/tariff topic classification"""
-        modeler = TopicModeler()
-        text = "We are imposing new tariffs on China to protect American manufacturing."
+    @pytest.mark.parametrize('text,topic,expected_fields', [
+        pytest.param(
+            "We are imposing new tariffs on China to protect American manufacturing.",
+            'trade_tariffs', {'etf': 'XLI'}, id='trade'
+        ),
+        pytest.param(
+            "We are cutting corporate taxes to boost economic growth.",
+            'tax_policy', {}, id='tax'
+        ),
+        pytest.param(
+            "We support American oil and gas drilling for energy independence.",
+            'energy_policy', {'etf': 'XLE', 'direction': 'long'}, id='energy'
+        ),
+    ])
+    def test_classify_topic(self, topic_modeler, text, topic, expected_fields):
+        """Test policy topic classification and its sector mapping"""
+        result = topic_modeler.classify_topic(text)
+        
+        assert result['topic'] in [topic, 'unknown']
+        if result['topic'] == topic:
+            for field, value in expected_fields.items():
+                assert result[field] == value
+    
+    def test_classify_unknown_topic(self, topic_modeler):
+        """Test unknown topic handling"""
+        text = "Random text with no political keywords."
         
-        result = modeler.classify_topic(text)
+        result = topic_modeler.classify_topic(text)
         
-        assert result['topic'] in ['trade_tariffs', 'unknown']
-        if result['topic'] == 'trade_tariffs':
-            assert result['etf'] == 'XLI'
+        assert result['topic'] == 'unknown'
+        assert result['confidence'] == 0.0
     
-    def test_classify_tax_topic(self):
-        """Test tax policy topic classification"""
-        modeler = TopicModeler()
-        text = "We are cutting corporate taxes to boost economic growth."
+    def test_classify_topics_batch_matches_single(self, topic_modeler):
+        """Test batch topic classification agrees with per-text classification"""
+        texts = [
+            "We are imposing new tariffs on China to protect American manufacturing.",
+            "We support American oil and gas drilling for energy independence.",
+            "Random text with no political keywords."
+        ]
         
-        result = modeler.classify_topic(text)
+        batch = topic_modeler.classify_topics_batch(texts)
         
-        assert result['topic'] in ['tax_policy', 'unknown']
+        assert batch == [topic_modeler.classify_topic(text) for text in texts]
     
-    def test_classify_energy_topic(self):
-        """Test energy topic classification"""
-        modeler = TopicModeler()
-        text = "We support American oil and gas drilling for energy independence."
+    def test_save_and_load(self, tmp_path):
+        """Test fitted LDA state round-trips through save/load"""
+        modeler = TopicModeler(n_topics=3)
+        corpus = [
+            "tariffs on china trade imports",
+            "tax cuts for corporate revenue",
+            "oil gas drilling pipeline energy"
+        ] * 5
+        modeler.fit(corpus)
+        path = str(tmp_path / 'topic_model.joblib')
         
-        result = modeler.classify_topic(text)
+        modeler.save(path)
+        loaded = TopicModeler.load(path)
         
-        assert result['topic'] in ['energy_policy', 'unknown']
-        if result['topic'] == 'energy_policy':
-            assert result['etf'] == 'XLE'
-            assert result['direction'] == 'long'
+        assert loaded.fitted
+        assert loaded.n_topics == 3
+        assert list(loaded.feature_columns) == list(modeler.feature_columns)
     
-    def test_classify_unknown_topic(self):
-        """Test unknown topic handling"""
-        modeler = TopicModeler()
-        text = "Random text with no political keywords."
-        
-        result = modeler.classify_topic(text)
-        
-        assert result['topic'] == 'unknown'
-        assert result['confidence'] == 0.0
+    def test_save_unfitted_raises(self, tmp_path):
+        """Test saving an unfitted modeler is rejected"""
+        with pytest.raises(ValueError):
+            TopicModeler().save(str(tmp_path / 'topic_model.joblib'))
 
 
 class TestNLPPipeline:
@@ -182,12 +288,11 @@ class TestNLPPipeline:
         assert pipeline.entity_extractor is not None
         assert pipeline.topic_modeler is not None
     
-    def test_process_text_basic(self):
+    def test_process_text_basic(self, nlp_pipeline):
         """Test basic text processing"""
-        pipeline = NLPPipeline()
         text = "Boeing is doing great work on the new aircraft."
         
-        result = pipeline.process_text(text)
+        result = nlp_pipeline.process_text(text)
         
         # Check all expected keys
         assert 'sentiment_polarity' in result
@@ -197,22 +302,20 @@ class TestNLPPipeline:
         assert 'signals' in result
         assert 'summary' in result
     
-    def test_process_text_with_timestamp(self):
+    def test_process_text_with_timestamp(self, nlp_pipeline):
         """Test processing with timestamp"""
-        pipeline = NLPPipeline()
         text = "Apple announces new product."
         timestamp = "2024-01-01T12:00:00Z"
         
-        result = pipeline.process_text(text, timestamp)
+        result = nlp_pipeline.process_text(text, timestamp)
         
         assert result['timestamp'] == timestamp
     
-    def test_generate_signals(self):
+    def test_generate_signals(self, nlp_pipeline):
         """Test signal generation"""
-        pipeline = NLPPipeline()
         text = "Boeing is doing terrible work. Cancel the order!"
         
-        result = pipeline.process_text(text)
+        result = nlp_pipeline.process_text(text)
         
         assert 'signals' in result
         assert len(result['signals']) > 0
@@ -224,43 +327,25 @@ class TestNLPPipeline:
             assert 'direction' in signal
             assert 'confidence' in signal
     
-    def test_positive_signal_generation(self):
-        """Test positive signal generation"""
-        pipeline = NLPPipeline()
-        text = "Apple is doing fantastic work! Best company ever!"
-        
-        result = pipeline.process_text(text)
+    @pytest.mark.parametrize('case', range(len(SIGNAL_CASES)), ids=['positive', 'negative'])
+    def test_signal_direction(self, signal_case_results, case):
+        """Test sentiment sign and stock signal direction (one batched run for all cases)"""
+        _, expected_sign, expected_direction = SIGNAL_CASES[case]
+        result = signal_case_results.iloc[case]
         
-        # Should have positive sentiment
-        assert result['sentiment_polarity'] > 0
+        # Polarity on the expected side of zero
+        assert result['sentiment_polarity'] * expected_sign > 0
         
-        # Should generate long signals
         stock_signals = [s for s in result['signals'] if s['type'] == 'stock']
         if stock_signals:
-            # At least one should be long
-            assert any(s['direction'] == 'long' for s in stock_signals)
-    
-    def test_negative_signal_generation(self):
-        """Test negative signal generation"""
-        pipeline = NLPPipeline()
-        text = "Boeing is a disaster! Worst company! Cancel everything!"
-        
-        result = pipeline.process_text(text)
-        
-        # Should have negative sentiment
-        assert result['sentiment_polarity'] < 0
-        
-        # Should generate short signals
-        stock_signals = [s for s in result['signals'] if s['type'] == 'stock']
-        if stock_signals:
-            # At least one should be short
-            assert any(s['direction'] == 'short' for s in stock_signals)
+            # At least one should follow the sentiment
+            assert any(s['direction'] == expected_direction for s in stock_signals)
 
 
 class TestBatchProcessing:
     """Test batch text processing"""
     
-    def test_batch_process_multiple_texts(self):
+    def test_batch_process_multiple_texts(self, nlp_pipeline):
         """Test processing multiple texts"""
         texts = [
             "Apple is doing great work.",
@@ -268,18 +353,18 @@ class TestBatchProcessing:
             "Microsoft announces new partnership."
         ]
         
-        df = batch_process_texts(texts)
+        df = batch_process_texts(texts, nlp_pipeline=nlp_pipeline)
         
         assert len(df) == 3
         assert 'sentiment_polarity' in df.columns
         assert 'tickers' in df.columns
     
-    def test_batch_process_with_timestamps(self):
+    def test_batch_process_with_timestamps(self, nlp_pipeline):
         """Test batch processing with timestamps"""
         texts = ["Apple news.", "Boeing update."]
         timestamps = ["2024-01-01T10:00:00Z", "2024-01-01T11:00:00Z"]
         
-        df = batch_process_texts(texts, timestamps)
+        df = batch_process_texts(texts, timestamps, nlp_pipeline=nlp_pipeline)
         
         assert len(df) == 2
         assert df['timestamp'].tolist() == timestamps
@@ -293,39 +378,45 @@ class TestSentimentExplainer:
         explainer = SentimentExplainer()
         assert explainer is not None
     
-    def test_simple_explanation_positive(self):
-        """Test simple explanation for positive sentiment"""
-        explainer = SentimentExplainer()
-        text = "This is great and wonderful work!"
-        prediction = {'label': 'positive', 'polarity': 0.8}
-        
-        explanation = explainer.explain_prediction(text, prediction, method='simple')
-        
-        assert 'positive_words' in explanation
-        assert len(explanation['positive_words']) > 0
-        assert 'great' in explanation['positive_words'] or 'wonderful' in explanation['positive_words']
-    
-    def test_simple_explanation_negative(self):
-        """Test simple explanation for negative sentiment"""
-        explainer = SentimentExplainer()
-        text = "This is terrible and awful work!"
-        prediction = {'label': 'negative', 'polarity': -0.8}
-        
-        explanation = explainer.explain_prediction(text, prediction, method='simple')
-        
-        assert 'negative_words' in explanation
-        assert len(explanation['negative_words']) > 0
-    
-    def test_explanation_method(self):
+    @pytest.mark.parametrize('text,prediction,expected_key,expected_words', [
+        ("This is great and wonderful work!", {'label': 'positive', 'polarity': 0.8},
+         'positive_words', {'great', 'wonderful'}),
+        ("This is terrible and awful work!", {'label': 'negative', 'polarity': -0.8},
+         'negative_words', {'terrible', 'awful'}),
+    ], ids=['positive', 'negative'])
+    def test_simple_explanation(self, sentiment_explainer, text, prediction, expected_key, expected_words):
+        """Test simple explanation picks up the lexicon words behind the label"""
+        explanation = sentiment_explainer.explain_prediction(text, prediction, method='simple')
+        
+        assert expected_key in explanation
+        assert len(explanation[expected_key]) > 0
+        assert expected_words & set(explanation[expected_key])
+    
+    def test_explanation_method(self, sentiment_explainer):
         """Test explanation includes method used"""
-        explainer = SentimentExplainer()
         text = "Sample text"
         prediction = {'label': 'neutral', 'polarity': 0.0}
         
-        explanation = explainer.explain_prediction(text, prediction)
+        explanation = sentiment_explainer.explain_prediction(text, prediction, method='simple')
         
         assert 'method' in explanation
         assert explanation['method'] in ['keyword', 'shap']
+    
+    @pytest.mark.slow
+    def test_shap_explanation(self, sentiment_analyzer):
+        """Test the SHAP path on the loaded transformer (falls back to keywords on failure)"""
+        if not sentiment_analyzer.model_loaded:
+            pytest.skip('Transformer model not loaded')
+        
+        hf_pipeline = sentiment_analyzer.sentiment_pipeline
+        explainer = SentimentExplainer(model=hf_pipeline.model, tokenizer=hf_pipeline.tokenizer)
+        
+        # One short input keeps the Shapley sampling small
+        explanation = explainer.explain_prediction(
+            "Great work!", {'label': 'positive', 'polarity': 0.8}, method='shap'
+        )
+        
+        assert explanation['method'] in ['keyword', 'shap']
 
 
 class TestSignalExplainer:
@@ -417,31 +508,24 @@ class TestExplanationReport:
 class TestEdgeCases:
     """Test edge cases and error handling"""
     
-    def test_empty_text(self):
+    def test_empty_text(self, nlp_pipeline):
         """Test handling of empty text"""
-        pipeline = NLPPipeline()
         
-        result = pipeline.process_text("")
+        result = nlp_pipeline.process_text("")
         
         assert result is not None
         assert 'sentiment_polarity' in result
     
-    def test_very_long_text(self):
+    def test_very_long_text(self, long_text_result):
         """Test handling of very long text"""
-        pipeline = NLPPipeline()
-        long_text = "Apple is great. " * 1000  # Very long text
-        
-        result = pipeline.process_text(long_text)
-        
-        assert result is not None
-        assert 'tickers' in result
+        assert long_text_result is not None
+        assert 'tickers' in long_text_result
     
-    def test_no_company_mentions(self):
+    def test_no_company_mentions(self, nlp_pipeline):
         """Test text with no company mentions"""
-        pipeline = NLPPipeline()
         text = "This is a generic political statement with no companies."
         
-        result = pipeline.process_text(text)
+        result = nlp_pipeline.process_text(text)
         
         assert result is not None
         assert isinstance(result['tickers'], list)